@@ -5,7 +5,7 @@ import mysql.connector
 import os
 import pandas as pd
 import sys
-from visualize2 import visualize_bridge_csv_comlog
+from visualize2 import visualize_bridge_csv_comlog, visualize_bridge_heatmap
 
 
 
@@ -25,6 +25,14 @@ def _get_output_dir():
     return output_dir
 
 
+def _resolve_host(database):
+    if database == "mariadb":
+        return "icyccdb02.icy.nl"
+    if database == "mysql":
+        return "icyccdb.icy.nl"
+    raise ValueError(f"Unsupported database: {database}")
+
+
 def comlog_overzicht_bridge(
     database,
     klant_db_naam,
@@ -43,16 +51,7 @@ def comlog_overzicht_bridge(
         filter_input = _clean_arg(filter_input)
         sort_by = _clean_arg(sort_by)
 
-        if database == "mariadb":
-            host = "icyccdb02.icy.nl"
-            #db_password = mariadb_pwd
-
-        elif database == "mysql":
-            host = 'icyccdb.icy.nl'
-            print("test")
-            #db_password = mysql_pwd
-        else:
-            raise ValueError(f"Unsupported database: {database}")
+        host = _resolve_host(database)
         conn = mysql.connector.connect(host=host, user=db_gebruiker, password=db_password, port=3306, use_pure=True)
         cursor = conn.cursor()
 
@@ -108,6 +107,86 @@ def comlog_overzicht_bridge(
         print("Foutje", e)
 
 
+# Herstart-berichten herkennen we aan dezelfde reeks als visualize2 ("5555 30 434f4e").
+RESTART_LIKE = "%5555 30 434f4e%"
+# Overige bridge-communicatie; zelfde volgorde als classify_comments: restart > ab > other.
+AB_LIKE = "%abab%"
+
+
+def comlog_heatmap_bridge(
+    database,
+    klant_db_naam,
+    aantal_min_geleden,
+    db_gebruiker,
+    db_password,
+    filter_input,
+    sort_by="bridge_id",
+):
+    """Heatmap van berichten per bridge per uur, geaggregeerd op de database.
+
+    In plaats van alle comlog-regels op te halen laat de database de
+    `GROUP BY inbridgeid, uur` doen en komt alleen de compacte matrix
+    (restart/ab/other aantallen per bridge per uur) over het netwerk.
+    Alleen berichten die op `filter_input` matchen tellen mee; elk bericht
+    valt in precies een klasse: restart, anders ab, anders other.
+    """
+    try:
+        database = _clean_arg(database).lower()
+        klant_db_naam = _clean_arg(klant_db_naam)
+        aantal_min_geleden = int(_clean_arg(str(aantal_min_geleden)))
+        db_gebruiker = _clean_arg(db_gebruiker)
+        db_password = _clean_arg(db_password)
+        filter_input = _clean_arg(filter_input)
+        sort_by = _clean_arg(sort_by)
+
+        host = _resolve_host(database)
+        conn = mysql.connector.connect(host=host, user=db_gebruiker, password=db_password, port=3306, use_pure=True)
+        cursor = conn.cursor()
+
+        if len(filter_input) == 0:
+            filter_input = "ab abab"
+        filter_like = f"%{filter_input}%"
+
+        output_dir = _get_output_dir()
+
+        # Uur-bucket zonder DATE_FORMAT zodat er geen '%' in de query staat naast de parameters.
+        cursor.execute(
+            "SELECT c.inbridgeid, "
+            "FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(c.timestamp) / 3600) * 3600) AS hour, "
+            "SUM(COALESCE(c.comment, '') LIKE %s) AS restart, "
+            "SUM(COALESCE(c.comment, '') NOT LIKE %s AND COALESCE(c.comment, '') LIKE %s) AS ab, "
+            "SUM(COALESCE(c.comment, '') NOT LIKE %s AND COALESCE(c.comment, '') NOT LIKE %s) AS other "
+            f"FROM {klant_db_naam}.communicationlog AS c "
+            "WHERE c.direction = 1 AND c.inbridgeid IS NOT NULL "
+            "AND c.timestamp >= NOW() - INTERVAL %s MINUTE "
+            "AND COALESCE(c.comment, '') LIKE %s "
+            "GROUP BY c.inbridgeid, hour",
+            (RESTART_LIKE, RESTART_LIKE, AB_LIKE, RESTART_LIKE, AB_LIKE, aantal_min_geleden, filter_like),
+        )
+        counts = pd.DataFrame(cursor.fetchall(), columns=["bridge_id", "hour", "restart", "ab", "other"])
+
+        cursor.execute(f"SELECT inbridgeid, bridgetype, swversion, polling, pollfailure FROM {klant_db_naam}.inbridge")
+        meta = pd.DataFrame(cursor.fetchall(), columns=["bridge_id", "bridgetype", "swversion", "polling", "pollfailure"])
+        cursor.close()
+        conn.close()
+
+        if counts.empty:
+            print(f"Geen communicatie gevonden in de laatste {aantal_min_geleden} minuten.")
+            return
+
+        csv_heatmap_path = os.path.join(
+            output_dir,
+            f"bridge_com_heatmap_{klant_db_naam}_{aantal_min_geleden}_min.csv",
+        )
+        counts.to_csv(csv_heatmap_path, index=False)
+        print(f"heatmap csv opgeslagen ({len(counts)} bridge-uren)")
+
+        visualize_bridge_heatmap(counts, klant_db_naam, sort_by, output_dir, meta=meta)
+
+    except Exception as e:
+        print("Foutje", e)
+
+
 def _prompt_text(label, default=None, required=False, secret=False):
     while True:
         if default is not None:
@@ -170,6 +249,12 @@ def _resolve_args():
     parser.add_argument("db_password", nargs="?")
     parser.add_argument("filter_input", nargs="?")
     parser.add_argument("sort_by", nargs="?")
+    parser.add_argument(
+        "--mode",
+        choices=["timeline", "heatmap"],
+        default="timeline",
+        help="timeline: alle comlog-regels per bridge; heatmap: berichten per bridge per uur (aggregatie op de database)",
+    )
     args = parser.parse_args()
 
     database = args.database
@@ -210,6 +295,7 @@ def _resolve_args():
         db_password,
         filter_input,
         sort_by,
+        args.mode,
     )
 
 if __name__ == "__main__":
@@ -221,9 +307,11 @@ if __name__ == "__main__":
         db_password,
         filter_input,
         sort_by,
+        mode,
     ) = _resolve_args()
 
-    comlog_overzicht_bridge(
+    viewer = comlog_heatmap_bridge if mode == "heatmap" else comlog_overzicht_bridge
+    viewer(
         database,
         klant_db_naam,
         aantal_min_geleden,
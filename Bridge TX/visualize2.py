@@ -211,6 +211,128 @@ def visualize_bridge_csv_comlog(csv_filtered, csv_unfiltered, sort_by, output_di
     print(f"Bestand: {output_path} opgeslagen")
 
 
+# Sorteeropties van de timeline vertaald naar de kolommen van de heatmap-matrix.
+HEATMAP_SORT_COLUMNS = {
+    "bridge_id": "bridge_id",
+    "restart": "restart",
+    "filtered": "ab",
+    "unfiltered": "other",
+    "ab": "ab",
+    "other": "other",
+    "total": "total",
+    # uit `meta` (inbridge), zelfde berekening als de timeline
+    "poll_pct": "poll_pct",
+    "fail_pct": "fail_pct",
+    "bridgetype": "bridgetype",
+    "swversion": "swversion",
+}
+
+# Boven dit aantal cellen laten we de ab/herstart/overig uitsplitsing uit de hover weg,
+# anders wordt de HTML bij duizenden bridges x weken aan uren onnodig groot.
+HEATMAP_MAX_DETAIL_CELLS = 1_000_000
+
+
+def visualize_bridge_heatmap(counts, klantnaam, sort_by="bridge_id", output_dir=None, meta=None):
+    """Render een bridges x uren heatmap uit voor-geaggregeerde aantallen.
+
+    `counts` bevat per bridge per uur: bridge_id, hour, restart, ab, other
+    (zoals teruggegeven door de GROUP BY query in Bridge_Comlog_Viewer).
+    `meta` (optioneel) bevat bridge_id, bridgetype, swversion, polling en pollfailure
+    voor de labels en de sortering op poll_pct/fail_pct/bridgetype/swversion.
+    """
+    df = counts.copy()
+    for col in ("restart", "ab", "other"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+    df["total"] = df["restart"] + df["ab"] + df["other"]
+    df["hour"] = pd.to_datetime(df["hour"], errors="coerce")
+    df = df.dropna(subset=["hour"])
+    if df.empty:
+        print("Geen data voor heatmap.")
+        return None
+
+    summary_df = df.groupby("bridge_id")[["restart", "ab", "other", "total"]].sum().reset_index()
+    if meta is not None and not meta.empty:
+        bridge_meta = meta.copy()
+        if {"polling", "pollfailure"} <= set(bridge_meta.columns):
+            polling = pd.to_numeric(bridge_meta["polling"], errors="coerce").fillna(0)
+            fail = pd.to_numeric(bridge_meta["pollfailure"], errors="coerce").fillna(0)
+            total = polling + fail
+            bridge_meta["poll_pct"] = (polling / total * 100).where(total > 0, 0)
+            bridge_meta["fail_pct"] = (fail / total * 100).where(total > 0, 0)
+        summary_df = summary_df.merge(bridge_meta.drop(columns=["polling", "pollfailure"], errors="ignore"), on="bridge_id", how="left")
+    sort_col = HEATMAP_SORT_COLUMNS.get(sort_by)
+    if sort_col not in summary_df.columns:
+        print(f"[WARNING] sort_by '{sort_by}' is not valid. Using default.")
+        sort_col = "bridge_id"
+    summary_df = summary_df.sort_values(sort_col, ascending=False)
+    bridges = summary_df["bridge_id"].tolist()
+
+    # Volledige uren-as zodat uren zonder berichten (gaten) als 0 zichtbaar zijn
+    hours = pd.date_range(df["hour"].min(), df["hour"].max(), freq="h")
+
+    def _matrix(value_col):
+        return (
+            df.pivot_table(index="bridge_id", columns="hour", values=value_col, aggfunc="sum", fill_value=0)
+            .reindex(index=bridges, columns=hours, fill_value=0)
+            .to_numpy()
+        )
+
+    z = _matrix("total")
+
+    labels_meta = {}
+    if meta is not None and not meta.empty:
+        labels_meta = meta.set_index("bridge_id")[["bridgetype", "swversion"]].to_dict("index")
+    y_labels = []
+    for bridge_id in bridges:
+        m = labels_meta.get(bridge_id)
+        if m:
+            y_labels.append(f"Bridge {bridge_id} | {m['bridgetype']} | SW {m['swversion']}")
+        else:
+            y_labels.append(f"Bridge {bridge_id}")
+
+    heatmap_kwargs = dict(
+        z=z,
+        x=hours,
+        y=y_labels,
+        colorscale="YlOrRd",
+        zmin=0,
+        colorbar=dict(title="Berichten/uur"),
+        hovertemplate="<b>%{y}</b><br>%{x}<br>Totaal: %{z}<extra></extra>",
+    )
+    if z.size <= HEATMAP_MAX_DETAIL_CELLS:
+        heatmap_kwargs["customdata"] = np.dstack([_matrix("ab"), _matrix("restart"), _matrix("other")])
+        heatmap_kwargs["hovertemplate"] = (
+            "<b>%{y}</b><br>%{x}<br>Totaal: %{z}<br>"
+            "<span style='color:#D70338'>abab: %{customdata[0]}</span><br>"
+            "<span style='color:#000000'>Herstart: %{customdata[1]}</span><br>"
+            "<span style='color:#1f77b4'>Overig: %{customdata[2]}</span><extra></extra>"
+        )
+
+    num_bridges = len(bridges)
+    fig = go.Figure(go.Heatmap(**heatmap_kwargs))
+    fig.update_layout(
+        title=f"Berichten per uur per Bridge van {klantnaam.capitalize()}<br><sup>{num_bridges} bridges x {len(hours)} uur | lichte cel = weinig/geen berichten in dat uur</sup>",
+        xaxis_title="Uur",
+        yaxis=dict(
+            autorange="reversed",
+            showticklabels=num_bridges <= 150,
+        ),
+        # begrens de hoogte: bij duizenden bridges wordt een rij een paar pixels
+        height=150 + min(max(num_bridges * 20, 300), 6000),
+        template="plotly_white",
+        margin=dict(t=60, b=5, l=0, r=5),
+    )
+
+    bestand_naam = "bridge_com_heatmap.html"
+    if output_dir:
+        output_path = os.path.join(output_dir, f"{klantnaam} {bestand_naam}")
+    else:
+        output_path = f"{klantnaam} {bestand_naam}"
+    fig.write_html(output_path, auto_open=True)
+    print(f"Bestand: {output_path} opgeslagen")
+    return output_path
+
+
 #visualize_bridge_csv_comlog(r"C:\tmp\bridge_com_overzicht_alle_klanten_1440_min_filtered.csv",
 #                            r"C:\tmp\bridge_com_overzicht_alle_klanten_1440_min_unfiltered.csv",
 #                            "bridge_id"
@@ -0,0 +1,94 @@
+"""Drill-down data for one bridge, for the Details action of the db_menu table view.
+
+`fetch_bridge_details` reads recent restarts, the last comlog lines and the
+attached device/slavedevice counts in one UNION ALL query on a connection the
+caller already has open. `DetailsCache` keeps the results in process for a
+short TTL, so going back and forth between bridges needs no query at all.
+Kept free of import side effects so db_menu can import it.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import time
+
+
+DETAILS_TTL = 60  # seconds
+DETAILS_CACHE_SIZE = 128
+DETAILS_RESTARTS = 5
+DETAILS_COMLOG_LINES = 10
+
+# restart (CONN) messages, same pattern as check_bridge_restarts_raw in list_bridges_prompt
+RESTART_PATTERN = 'ab abab 55 5555 30 434f4e4e________________'
+
+# every part returns (kind, id, timestamp, text, extra); the counts put their value in `id`
+_DETAILS_SQL = """
+(SELECT 'restart' AS kind, communicationlogid AS id, timestamp AS ts,
+        inet_ntoa(conv(substr(comment, 28, 8), 16, 10)) AS text,
+        timestamp - INTERVAL conv(substr(comment, 36, 8), 16, 10) SECOND AS extra
+ FROM communicationlog
+ WHERE inbridgeid = %s AND comment LIKE %s
+ ORDER BY communicationlogid DESC LIMIT %s)
+UNION ALL
+(SELECT 'comlog', communicationlogid, timestamp, comment, NULL
+ FROM communicationlog
+ WHERE inbridgeid = %s
+ ORDER BY communicationlogid DESC LIMIT %s)
+UNION ALL
+(SELECT 'devices', COUNT(*), NULL, NULL, NULL FROM device WHERE inbridgeid = %s)
+UNION ALL
+(SELECT 'slavedevices', COUNT(*), NULL, NULL, NULL FROM slavedevice WHERE inbridgeid = %s)
+"""
+
+
+def fetch_bridge_details(cur, inbridgeid: int, restarts: int = DETAILS_RESTARTS, comlog_lines: int = DETAILS_COMLOG_LINES) -> dict:
+    """Details of one bridge from a single query on `cur`.
+
+    Returns {'restarts': [(timestamp, ip, starttime)], 'comlog': [(id, timestamp, comment)],
+    'devices': int, 'slavedevices': int}, newest rows first.
+    """
+    bid = int(inbridgeid)
+    cur.execute(_DETAILS_SQL, (bid, RESTART_PATTERN, int(restarts), bid, int(comlog_lines), bid, bid))
+    details = {'restarts': [], 'comlog': [], 'devices': 0, 'slavedevices': 0}
+    for kind, row_id, ts, text, extra in cur.fetchall():
+        if kind == 'restart':
+            details['restarts'].append((ts, text, extra))
+        elif kind == 'comlog':
+            details['comlog'].append((row_id, ts, text))
+        else:
+            details[kind] = int(row_id or 0)
+    # UNION ALL keeps no order across the parts
+    details['restarts'].sort(key=lambda r: r[0], reverse=True)
+    details['comlog'].sort(key=lambda r: r[0], reverse=True)
+    return details
+
+
+class DetailsCache:
+    """Small LRU of bridge details with a TTL per entry.
+
+    Keys are (host, schema, inbridgeid). `get` returns (details, age in
+    seconds) or None when the entry is missing or older than `ttl`.
+    """
+
+    def __init__(self, maxsize: int = DETAILS_CACHE_SIZE, ttl: float = DETAILS_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[1]
+        if age > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0], age
+
+    def put(self, key, details):
+        self._entries[key] = (details, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
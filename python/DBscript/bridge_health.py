@@ -0,0 +1,85 @@
+"""Per-bridge health figures for the db_menu table view.
+
+Restarts and the longest gap between two comlog messages over the last
+`HEALTH_DAYS` days come from the local comlog rollups when the schema has
+them for this host (brought up to date incrementally first), otherwise from one windowed
+SQL aggregate per chunk of bridges. Poll-fail % is taken from the bridge's own
+counters. Kept free of import side effects so db_menu can import it.
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta
+import sqlite3
+
+from bridge_metrics import RESTART_MARKERS, pollfail_percent
+from comlog_rollup import has_rollups, read_rollups, update_rollups
+from local_store import open_store
+
+
+HEALTH_DAYS = 7
+HEALTH_COLUMNS = ('restarts', 'max gap', 'fail %')
+
+# LOCATE instead of LIKE: no '%' to escape next to the connector's %s parameters
+_RESTART_SQL = ' OR '.join(f"LOCATE('{m}', LOWER(comment)) > 0" for m in RESTART_MARKERS)
+
+_COMLOG_HEALTH_SQL = """
+SELECT inbridgeid, SUM(is_restart), MAX(gap_s) / 60
+FROM (
+    SELECT inbridgeid,
+           ({restart}) AS is_restart,
+           TIMESTAMPDIFF(SECOND, LAG(timestamp) OVER (PARTITION BY inbridgeid ORDER BY timestamp), timestamp) AS gap_s
+    FROM communicationlog
+    WHERE timestamp >= %s AND inbridgeid IN ({ids})
+) t
+GROUP BY inbridgeid
+"""
+
+
+def health_from_rollups(conn, schema: str, host: str, days: int = HEALTH_DAYS, store: sqlite3.Connection | None = None) -> dict | None:
+    """{inbridgeid: (restarts, max gap in minutes)} from the hourly rollups, or None when `schema` has none
+    built from `host` (rollups are keyed by schema name only, the same name can exist on two hosts).
+
+    `conn` is an open MySQL connection with `schema` as default database; it is
+    only used to fold in the comlog rows newer than the rollup watermark.
+    """
+    own_store = store is None
+    store = store or open_store()
+    try:
+        if not has_rollups(schema, store, host=host):
+            return None
+        update_rollups(conn, schema, store=store)
+        hourly = read_rollups(schema, 'hourly', days, store=store)
+    finally:
+        if own_store:
+            store.close()
+    g = hourly.groupby('inbridgeid').agg(restart=('restart', 'sum'), max_gap_min=('max_gap_min', 'max'))
+    return {int(bid): (int(r.restart), round(float(r.max_gap_min), 1)) for bid, r in g.iterrows()}
+
+
+def health_from_comlog(conn, ids, days: int = HEALTH_DAYS) -> dict:
+    """{inbridgeid: (restarts, max gap in minutes)} for `ids` in one aggregate (needs MySQL 8 for LAG).
+
+    Bridges without comlog messages in the window are left out.
+    """
+    ids = [int(i) for i in ids]
+    if not ids:
+        return {}
+    since = datetime.now() - timedelta(days=int(days))
+    sql = _COMLOG_HEALTH_SQL.format(restart=_RESTART_SQL, ids=', '.join(['%s'] * len(ids)))
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, (since, *ids))
+        return {
+            int(bid): (int(restarts or 0), None if gap is None else round(float(gap), 1))
+            for bid, restarts, gap in cur.fetchall()
+        }
+    finally:
+        cur.close()
+
+
+def pollfail_pct(polling, pollfailure) -> float | None:
+    """`pollfail_percent` for one bridge: 0.0 without polls, None for non-numeric counters."""
+    try:
+        float(polling or 0), float(pollfailure or 0)
+    except (TypeError, ValueError):
+        return None
+    return float(pollfail_percent([polling], [pollfailure])[0])
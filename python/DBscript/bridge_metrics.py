@@ -0,0 +1,34 @@
+"""Vectorized bridge metric helpers shared by the DB scripts.
+
+Kept free of import side effects (no credential prompts, no connections) so
+that both `list_bridges_prompt.py` and helper modules can import it.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+
+# Same rules as `_classify_comment` in analyze_all_bridges: CONN (434f4e) messages
+# are restarts, remaining 'abab' traffic is ab, everything else is other.
+RESTART_MARKERS = ('434f', 'conn')
+AB_MARKER = 'abab'
+COMMENT_CLASSES = ('restart', 'ab', 'other')
+
+
+def classify_comments(comments: pd.Series) -> np.ndarray:
+    """Classify a Series of comlog comments as 'restart', 'ab' or 'other'."""
+    lc = comments.fillna('').astype(str).str.lower()
+    is_restart = np.zeros(len(lc), dtype=bool)
+    for marker in RESTART_MARKERS:
+        is_restart |= lc.str.contains(marker, regex=False).to_numpy()
+    is_ab = lc.str.contains(AB_MARKER, regex=False).to_numpy()
+    return np.select([is_restart, is_ab], ['restart', 'ab'], default='other')
+
+
+def pollfail_percent(polling, pollfailure) -> np.ndarray:
+    """Vectorized `100 * pollfailure / polling`, rounded to 1 decimal; 0.0 where polling is 0/missing."""
+    poll = pd.to_numeric(pd.Series(polling), errors='coerce').fillna(0).to_numpy(dtype=float)
+    fail = pd.to_numeric(pd.Series(pollfailure), errors='coerce').fillna(0).to_numpy(dtype=float)
+    has_poll = poll > 0
+    pct = np.where(has_poll, 100.0 * fail / np.where(has_poll, poll, 1.0), 0.0)
+    return np.round(pct, 1)
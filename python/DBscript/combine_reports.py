@@ -1,54 +1,136 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import argparse
+import csv
 import pandas as pd
-import re
+
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from exporters import append_sheet, open_with_fallback, unique_title, write_with_fallback
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # optional: parquet inputs
+    pq = None
+
+
+READ_WORKERS = 8
+SNIFF_BYTES = 64 * 1024
+SOURCE_COLUMN = 'source_db_report'
+
+
+def _sniff_sep(path):
+    """Delimiter of a per-db CSV from its first bytes; ';' (our own export format) when undecided."""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        sample = f.read(SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=';,\t').delimiter
+    except csv.Error:
+        return ';'
+
+
+def _read_header(path):
+    """(columns, sep) of an input file without reading its rows; sep is None for parquet."""
+    if path.suffix == '.parquet':
+        return pq.read_schema(path).names, None
+    sep = _sniff_sep(path)
+    return list(pd.read_csv(path, sep=sep, encoding='utf-8-sig', nrows=0).columns), sep
+
+
+def _read_report(path, sep):
+    if sep is None:
+        return pd.read_parquet(path)
+    return pd.read_csv(path, sep=sep, encoding='utf-8-sig')
+
+
+def _read_in_order(inputs, workers):
+    """Yield (path, df or exception) in input order, reading up to 2 * workers files ahead."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        it = iter(inputs)
+        for path, sep in it:
+            pending.append((path, pool.submit(_read_report, path, sep)))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            path, fut = pending.popleft()
+            try:
+                yield path, fut.result()
+            except Exception as e:
+                yield path, e
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt[0], pool.submit(_read_report, *nxt)))
 
 
 def main():
     parser = argparse.ArgumentParser(description='Combine per-db bridge health CSV reports into a single CSV and XLSX workbook')
     parser.add_argument('--dir', default='.', help='Directory containing per-db CSV reports (default: current dir)')
     parser.add_argument('--pattern', default='bridge_health_report_*.csv', help='Glob pattern for per-db CSVs')
+    parser.add_argument('--parquet-pattern', default='bridge_health_report_*.parquet', help='Glob pattern for per-db Parquet reports (needs pyarrow)')
     parser.add_argument('--out-prefix', default='bridge_health_report_combined', help='Output prefix for combined files')
+    parser.add_argument('--workers', type=int, default=READ_WORKERS, help=f'Number of files read in parallel (default: {READ_WORKERS})')
     parser.add_argument('--keep-sources', action='store_true', help='Keep the original per-db CSV files (default: remove them after successful combine)')
     args = parser.parse_args()
 
     p = Path(args.dir)
-    csvs = sorted(p.glob(args.pattern))
-    if not csvs:
+    xlsx_path = p / (args.out_prefix + '.xlsx')
+    csv_out = p / (args.out_prefix + '.csv')
+    sources = sorted(f for f in p.glob(args.pattern) if f not in (csv_out, xlsx_path))
+    parquets = sorted(p.glob(args.parquet_pattern)) if args.parquet_pattern else []
+    if parquets and pq is None:
+        print(f'Skipping {len(parquets)} Parquet reports: pyarrow is not installed')
+        parquets = []
+    sources += parquets
+    if not sources:
         print('No per-db CSV reports found.')
         raise SystemExit(1)
 
-    combined_rows = []
-    xlsx_path = p / (args.out_prefix + '.xlsx')
-    csv_out = p / (args.out_prefix + '.csv')
-    with pd.ExcelWriter(xlsx_path, engine='openpyxl') as ew:
-        for f in csvs:
-            try:
-                # prefer semicolon-separated files with UTF-8 BOM, fallback to default CSV parsing
-                try:
-                    df = pd.read_csv(f, sep=';', encoding='utf-8-sig')
-                except Exception:
-                    df = pd.read_csv(f)
-            except Exception as e:
-                print(f'Failed to read {f}: {e}')
+    # headers first (cheap), so the combined CSV can be streamed with the union of all columns
+    inputs, columns = [], []
+    for f in sources:
+        try:
+            names, sep = _read_header(f)
+        except Exception as e:
+            print(f'Failed to read {f}: {e}')
+            continue
+        inputs.append((f, sep))
+        columns += [c for c in names if c not in columns]
+    combined_columns = columns + [SOURCE_COLUMN]
+
+    wb = Workbook(write_only=True)
+    header_font = Font(bold=True)
+    used = set()
+    read = []
+    try:
+        csv_written, out = open_with_fallback(csv_out, label='CSV', encoding='utf-8-sig', newline='')
+    except Exception as e:
+        print(f'Failed to write {csv_out}: {e}')
+        raise SystemExit(1)
+    with out:
+        pd.DataFrame(columns=combined_columns).to_csv(out, index=False, sep=';')
+        for f, df in _read_in_order(inputs, max(1, args.workers)):
+            if isinstance(df, Exception):
+                print(f'Failed to read {f}: {df}')
                 continue
-            # sanitize sheet name
-            sheet = re.sub(r"[\[\]\:\*\?/\\]", "_", f.stem)[:31]
-            try:
-                df.to_excel(ew, sheet_name=sheet, index=False)
-            except Exception as e:
-                print(f'Failed to write sheet {sheet}: {e}')
-            df['source_db_report'] = f.name
-            combined_rows.append(df)
-
-    if combined_rows:
-        combined = pd.concat(combined_rows, ignore_index=True)
-        combined.to_csv(csv_out, index=False, sep=';', encoding='utf-8-sig')
-        print(f'Wrote {csv_out} and {xlsx_path}')
-        # remove source CSVs unless user requested to keep them
+            # each frame goes to its sheet and the combined CSV, then is dropped
+            append_sheet(wb, unique_title(f.stem, used), list(df.columns), [df], header_font=header_font)
+            df.assign(**{SOURCE_COLUMN: f.name}).reindex(columns=combined_columns).to_csv(out, index=False, header=False, sep=';')
+            read.append(f)
+
+    if read:
+        try:
+            xlsx_written = write_with_fallback(xlsx_path, lambda target: wb.save(str(target)), label='Excel')
+        except Exception as e:
+            print(f'Failed to write {xlsx_path}: {e}')
+            raise SystemExit(1)
+        print(f'Wrote {csv_written} and {xlsx_written}')
+        # remove source files unless user requested to keep them
         if not args.keep_sources:
             removed = 0
-            for f in csvs:
+            for f in read:
                 try:
                     f.unlink()
                     removed += 1
@@ -56,6 +138,7 @@ def main():
                     print(f'Failed to remove source file {f}: {e}')
             print(f'Removed {removed} source files')
     else:
+        csv_written.unlink(missing_ok=True)
         print('No data collected from per-db CSVs.')
 
 
@@ -0,0 +1,287 @@
+"""Hourly and daily `communicationlog` rollups per bridge, kept in the local store.
+
+`update_rollups` only fetches comlog rows newer than the stored watermark
+(`communicationlogid`) and folds them into per-bridge aggregates: message
+count per class (restart/ab/other), restarts and the longest gap between two
+messages. Long-range analysis reads these tables instead of scanning millions
+of raw rows, and `prune_rollups` applies a separate retention per grain.
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta
+import sqlite3
+
+import pandas as pd
+
+from bridge_metrics import classify_comments
+from local_store import open_store
+
+
+HOURLY_RETENTION_DAYS = 35
+DAILY_RETENTION_DAYS = 400
+FETCH_BATCH_SIZE = 50000
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+ROLLUP_COLUMNS = ['inbridgeid', 'bucket', 'total', 'restart', 'ab', 'other', 'max_gap_min']
+GRAINS = {'hourly': ('rollup_hourly', 'h'), 'daily': ('rollup_daily', 'D')}
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS rollup_watermark (
+    schema_name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    updated_at TEXT,
+    host TEXT
+);
+CREATE TABLE IF NOT EXISTS rollup_bridge_state (
+    schema_name TEXT NOT NULL,
+    inbridgeid INTEGER NOT NULL,
+    last_ts TEXT,
+    PRIMARY KEY (schema_name, inbridgeid)
+);
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    schema_name TEXT NOT NULL,
+    inbridgeid INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    restart INTEGER NOT NULL,
+    ab INTEGER NOT NULL,
+    other INTEGER NOT NULL,
+    max_gap_min REAL NOT NULL,
+    PRIMARY KEY (schema_name, inbridgeid, bucket)
+);
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    schema_name TEXT NOT NULL,
+    inbridgeid INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    restart INTEGER NOT NULL,
+    ab INTEGER NOT NULL,
+    other INTEGER NOT NULL,
+    max_gap_min REAL NOT NULL,
+    PRIMARY KEY (schema_name, inbridgeid, bucket)
+);
+CREATE INDEX IF NOT EXISTS ix_rollup_hourly_bucket ON rollup_hourly (schema_name, bucket);
+CREATE INDEX IF NOT EXISTS ix_rollup_daily_bucket ON rollup_daily (schema_name, bucket);
+"""
+
+_UPSERT_SQL = """
+INSERT INTO {table} (schema_name, inbridgeid, bucket, total, restart, ab, other, max_gap_min)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (schema_name, inbridgeid, bucket) DO UPDATE SET
+    total = total + excluded.total,
+    restart = restart + excluded.restart,
+    ab = ab + excluded.ab,
+    other = other + excluded.other,
+    max_gap_min = MAX(max_gap_min, excluded.max_gap_min)
+"""
+
+
+def _ensure_schema(store: sqlite3.Connection):
+    store.executescript(_SCHEMA_SQL)
+    # stores created before the host column: add it (NULL = host unknown)
+    columns = {r[1] for r in store.execute('PRAGMA table_info(rollup_watermark)')}
+    if 'host' not in columns:
+        store.execute('ALTER TABLE rollup_watermark ADD COLUMN host TEXT')
+
+
+def _get_watermark(store: sqlite3.Connection, schema: str):
+    """(last_id, host) of `schema`, or (None, None) before the first run."""
+    row = store.execute('SELECT last_id, host FROM rollup_watermark WHERE schema_name = ?', (schema,)).fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def _initial_watermark(conn, initial_days: int) -> int:
+    """First run: start at the first comlog row of the last `initial_days` days."""
+    cur = conn.cursor()
+    try:
+        since = datetime.now() - timedelta(days=int(initial_days))
+        cur.execute('SELECT MIN(communicationlogid) FROM communicationlog WHERE timestamp >= %s', (since,))
+        row = cur.fetchone()
+        if row and row[0] is not None:
+            return int(row[0]) - 1
+        cur.execute('SELECT COALESCE(MAX(communicationlogid), 0) FROM communicationlog')
+        row = cur.fetchone()
+        return int(row[0]) if row else 0
+    finally:
+        cur.close()
+
+
+def _fold_batch(store: sqlite3.Connection, schema: str, batch: pd.DataFrame):
+    """Aggregate one fetched batch and merge it into the hourly/daily tables."""
+    batch = batch.copy()
+    batch['timestamp'] = pd.to_datetime(batch['timestamp'], errors='coerce')
+    batch = batch.dropna(subset=['timestamp', 'inbridgeid'])
+    if batch.empty:
+        return
+    batch['inbridgeid'] = batch['inbridgeid'].astype(int)
+    batch = batch.sort_values(['inbridgeid', 'timestamp'], kind='stable')
+
+    # Previous message per bridge: within the batch a shift, across batches the stored last_ts
+    state = pd.read_sql_query(
+        'SELECT inbridgeid, last_ts FROM rollup_bridge_state WHERE schema_name = ?',
+        store, params=(schema,),
+    )
+    state_last = dict(zip(state['inbridgeid'].astype(int), pd.to_datetime(state['last_ts'], errors='coerce')))
+    carried = pd.to_datetime(batch['inbridgeid'].map(state_last), errors='coerce')
+    prev = batch.groupby('inbridgeid')['timestamp'].shift().fillna(carried)
+    gap = (batch['timestamp'] - prev).dt.total_seconds() / 60.0
+    batch['gap_min'] = gap.fillna(0).clip(lower=0)
+
+    cls = classify_comments(batch['comment'])
+    batch['restart'] = (cls == 'restart').astype(int)
+    batch['ab'] = (cls == 'ab').astype(int)
+    batch['other'] = (cls == 'other').astype(int)
+
+    for table, freq in GRAINS.values():
+        batch['bucket'] = batch['timestamp'].dt.floor(freq).dt.strftime(TS_FORMAT)
+        agg = batch.groupby(['inbridgeid', 'bucket'], sort=False).agg(
+            total=('timestamp', 'size'),
+            restart=('restart', 'sum'),
+            ab=('ab', 'sum'),
+            other=('other', 'sum'),
+            max_gap_min=('gap_min', 'max'),
+        ).reset_index()
+        store.executemany(
+            _UPSERT_SQL.format(table=table),
+            [
+                (schema, int(r.inbridgeid), r.bucket, int(r.total), int(r.restart), int(r.ab), int(r.other), round(float(r.max_gap_min), 1))
+                for r in agg.itertuples(index=False)
+            ],
+        )
+
+    last = batch.groupby('inbridgeid')['timestamp'].max()
+    store.executemany(
+        'INSERT INTO rollup_bridge_state (schema_name, inbridgeid, last_ts) VALUES (?, ?, ?) '
+        'ON CONFLICT (schema_name, inbridgeid) DO UPDATE SET last_ts = MAX(COALESCE(last_ts, \'\'), excluded.last_ts)',
+        [(schema, int(bid), ts.strftime(TS_FORMAT)) for bid, ts in last.items()],
+    )
+
+
+def update_rollups(conn, schema: str, store: sqlite3.Connection | None = None, initial_days: int = 30, batch_size: int = FETCH_BATCH_SIZE) -> int:
+    """Fetch comlog rows newer than the watermark for `schema` and fold them into the rollups.
+
+    `conn` is an open MySQL connection with `schema` as default database; its
+    host is recorded with the watermark the first time (see `has_rollups`).
+    Raises ValueError when the rollups of `schema` were built from another
+    host: its comlog ids would continue a watermark they have nothing to do with.
+    Returns the number of comlog rows processed.
+    """
+    own_store = store is None
+    store = store or open_store()
+    processed = 0
+    host = getattr(conn, 'server_host', None)
+    try:
+        _ensure_schema(store)
+        last_id, stored_host = _get_watermark(store, schema)
+        if stored_host is not None and host is not None and stored_host != host:
+            raise ValueError(f"rollups for {schema} were built from host {stored_host}, not {host}")
+        if last_id is None:
+            last_id = _initial_watermark(conn, initial_days)
+        cur = conn.cursor()
+        try:
+            while True:
+                cur.execute(
+                    'SELECT communicationlogid, inbridgeid, comment, timestamp FROM communicationlog '
+                    'WHERE communicationlogid > %s AND inbridgeid IS NOT NULL '
+                    'ORDER BY communicationlogid LIMIT %s',
+                    (last_id, int(batch_size)),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                batch = pd.DataFrame(rows, columns=['communicationlogid', 'inbridgeid', 'comment', 'timestamp'])
+                last_id = int(batch['communicationlogid'].max())
+                # watermark and aggregates move together: one sqlite transaction per batch
+                with store:
+                    _fold_batch(store, schema, batch)
+                    store.execute(
+                        'INSERT INTO rollup_watermark (schema_name, last_id, updated_at, host) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (schema_name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at, '
+                        'host = COALESCE(rollup_watermark.host, excluded.host)',
+                        (schema, last_id, datetime.now().strftime(TS_FORMAT), host),
+                    )
+                processed += len(rows)
+                if len(rows) < batch_size:
+                    break
+        finally:
+            cur.close()
+        return processed
+    finally:
+        if own_store:
+            store.close()
+
+
+def has_rollups(schema: str, store: sqlite3.Connection | None = None, host: str | None = None) -> bool:
+    """True when `update_rollups` has run for `schema` before (it has a watermark).
+
+    Rollups are keyed by schema name only; with `host`, only rollups recorded
+    as built from that host count, so a same-named schema on another server
+    is never mixed in.
+    """
+    own_store = store is None
+    store = store or open_store()
+    try:
+        _ensure_schema(store)
+        row = store.execute('SELECT host FROM rollup_watermark WHERE schema_name = ?', (schema,)).fetchone()
+        return row is not None and (host is None or row[0] == host)
+    finally:
+        if own_store:
+            store.close()
+
+
+def read_rollups(schema: str, grain: str = 'daily', days: int = 90, store: sqlite3.Connection | None = None) -> pd.DataFrame:
+    """Return rollup rows for `schema` over the last `days` days (columns: ROLLUP_COLUMNS)."""
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown rollup grain: {grain}")
+    table, freq = GRAINS[grain]
+    own_store = store is None
+    store = store or open_store()
+    try:
+        _ensure_schema(store)
+        since = pd.Timestamp(datetime.now() - timedelta(days=int(days))).floor(freq).strftime(TS_FORMAT)
+        df = pd.read_sql_query(
+            f'SELECT {", ".join(ROLLUP_COLUMNS)} FROM {table} WHERE schema_name = ? AND bucket >= ? ORDER BY inbridgeid, bucket',
+            store, params=(schema, since),
+        )
+        df['bucket'] = pd.to_datetime(df['bucket'])
+        return df
+    finally:
+        if own_store:
+            store.close()
+
+
+def summarize_rollups(daily: pd.DataFrame, restart_threshold: int = 3) -> pd.DataFrame:
+    """Per-bridge summary of daily rollups, in the column style of analyze_all_bridges."""
+    if daily.empty:
+        return pd.DataFrame()
+    g = daily.groupby('inbridgeid')
+    summary = g.agg(
+        total=('total', 'sum'),
+        restart=('restart', 'sum'),
+        ab=('ab', 'sum'),
+        max_restarts_in_day=('restart', 'max'),
+        max_gap_min=('max_gap_min', 'max'),
+        days=('bucket', 'nunique'),
+    )
+    summary['days_with_restarts_over_threshold'] = (daily['restart'] >= int(restart_threshold)).groupby(daily['inbridgeid']).sum()
+    idx = daily.loc[g['restart'].idxmax(), ['inbridgeid', 'bucket']].set_index('inbridgeid')['bucket']
+    summary['date_max_restarts'] = idx.dt.strftime('%Y-%m-%d').where(summary['max_restarts_in_day'] > 0)
+    return summary.reset_index()
+
+
+def prune_rollups(store: sqlite3.Connection | None = None, hourly_days: int = HOURLY_RETENTION_DAYS, daily_days: int = DAILY_RETENTION_DAYS) -> dict:
+    """Delete rollup buckets older than the retention of each grain. Returns deleted counts."""
+    own_store = store is None
+    store = store or open_store()
+    deleted = {}
+    try:
+        _ensure_schema(store)
+        with store:
+            for grain, keep_days in (('hourly', hourly_days), ('daily', daily_days)):
+                table, _ = GRAINS[grain]
+                cutoff = (datetime.now() - timedelta(days=int(keep_days))).strftime(TS_FORMAT)
+                cur = store.execute(f'DELETE FROM {table} WHERE bucket < ?', (cutoff,))
+                deleted[grain] = cur.rowcount
+        return deleted
+    finally:
+        if own_store:
+            store.close()
@@ -0,0 +1,66 @@
+"""Cached `host/schema` list for db_menu, kept in the local store.
+
+The schema list changes rarely, so db_menu shows the cached list at once and
+only asks the servers again when the cache is older than `DATABASE_LIST_TTL`
+(in the background). Entries are keyed by the configured hosts, so changing
+DB_HOST/DB_HOST2 never shows another server's schemas.
+"""
+from __future__ import annotations
+from datetime import datetime
+import sqlite3
+
+from local_store import open_store
+
+
+DATABASE_LIST_TTL = 24 * 3600  # seconds
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS database_list (
+    hosts TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (hosts, name)
+);
+"""
+
+
+def hosts_key(hosts) -> str:
+    return ','.join(h for h in hosts if h)
+
+
+def load_database_list(hosts, store: sqlite3.Connection | None = None):
+    """Return (names, age in seconds) of the cached list for `hosts`, or ([], None) when there is none."""
+    own_store = store is None
+    store = store or open_store()
+    try:
+        store.executescript(_SCHEMA_SQL)
+        rows = store.execute(
+            'SELECT name, fetched_at FROM database_list WHERE hosts = ? ORDER BY rowid', (hosts_key(hosts),)
+        ).fetchall()
+    finally:
+        if own_store:
+            store.close()
+    if not rows:
+        return [], None
+    fetched_at = datetime.strptime(min(r[1] for r in rows), TS_FORMAT)
+    return [r[0] for r in rows], (datetime.now() - fetched_at).total_seconds()
+
+
+def save_database_list(hosts, names, store: sqlite3.Connection | None = None):
+    """Replace the cached list for `hosts` with `names` (in that order), stamped now."""
+    own_store = store is None
+    store = store or open_store()
+    try:
+        store.executescript(_SCHEMA_SQL)
+        key = hosts_key(hosts)
+        now = datetime.now().strftime(TS_FORMAT)
+        with store:
+            store.execute('DELETE FROM database_list WHERE hosts = ?', (key,))
+            store.executemany(
+                'INSERT OR IGNORE INTO database_list (hosts, name, fetched_at) VALUES (?, ?, ?)',
+                [(key, n, now) for n in names],
+            )
+    finally:
+        if own_store:
+            store.close()
@@ -13,7 +13,10 @@ Safety: operations prompt for explicit confirmation and use transactions.
 from __future__ import annotations
 import os
 import time
+from datetime import datetime
 import getpass
+import codecs
+import functools
 try:
     from dotenv import load_dotenv
 except ImportError:  # pragma: no cover - helpful fallback when venv missing dependency
@@ -25,23 +28,167 @@ import shutil
 import sys
 import subprocess
 import tempfile
-
-# Cross-platform single-key reader
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from db_list_cache import DATABASE_LIST_TTL, load_database_list, save_database_list
+from db_search import DatabaseIndex, DatabaseSearch
+from bridge_details import DETAILS_COMLOG_LINES, DETAILS_RESTARTS, DetailsCache, fetch_bridge_details
+from bridge_health import HEALTH_COLUMNS, HEALTH_DAYS, health_from_comlog, health_from_rollups, pollfail_pct
+
+# Last status lines of background work (scan export progress, database list updates), shown under show_menu
+_SCAN_STATUS = deque(maxlen=4)
+# (label, Popen, reader thread) of scans started from the main menu
+_SCAN_CHILDREN = []
+# how often show_menu repaints the status lines while a scan is still exporting
+SCAN_STATUS_POLL_SECONDS = 0.25
+
+# Cross-platform key reader
 if os.name == 'nt':
     import msvcrt
-    def _getch():
-        return msvcrt.getwch()
+    # the console only interprets ANSI codes once VT mode is on; an empty shell command switches it on
+    # (this used to happen as a side effect of the `cls` call on every redraw)
+    os.system('')
 else:
-    import tty, termios
-    def _getch():
+    import select
+    import termios
+
+# the rest of an escape sequence arrives right behind the ESC; a lone ESC has nothing queued
+ESC_SEQUENCE_TIMEOUT = 0.05
+NAV_KEYS = ('UP', 'DOWN', 'PAGEUP', 'PAGEDOWN')
+
+
+class _KeyReader:
+    """Keyboard input for the interactive views.
+
+    `session()` keeps the POSIX terminal in raw mode for a whole view (ICANON,
+    ECHO and ISIG off; OPOST stays on so print() output still starts at column
+    0) instead of switching modes per key; sessions nest. `suspended()`
+    restores the normal mode around input() prompts. Reads take every byte
+    that is already queued, so `_get_nav_key` can merge auto-repeated keys.
+    On Windows msvcrt already reads single keys and the modes are no-ops.
+    """
+
+    def __init__(self):
+        self._buf = deque()
+        self._saved = None  # terminal attributes to restore, while in raw mode
+        self._depth = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    @staticmethod
+    def _raw_attrs(attrs):
+        raw = list(attrs)
+        raw[0] &= ~(termios.BRKINT | termios.ICRNL | termios.INPCK | termios.ISTRIP | termios.IXON)
+        raw[3] &= ~(termios.ECHO | termios.ICANON | termios.IEXTEN | termios.ISIG)
+        raw[6] = list(raw[6])
+        raw[6][termios.VMIN] = 1
+        raw[6][termios.VTIME] = 0
+        return raw
+
+    def _is_tty(self) -> bool:
+        return os.name != 'nt' and sys.stdin is not None and sys.stdin.isatty()
+
+    @contextmanager
+    def session(self):
+        if not self._is_tty():
+            yield
+            return
         fd = sys.stdin.fileno()
-        old = termios.tcgetattr(fd)
+        if self._depth == 0:
+            self._saved = termios.tcgetattr(fd)
+            termios.tcsetattr(fd, termios.TCSADRAIN, self._raw_attrs(self._saved))
+        self._depth += 1
         try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-            return ch
+            yield
         finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old)
+            self._depth -= 1
+            if self._depth == 0:
+                termios.tcsetattr(fd, termios.TCSADRAIN, self._saved)
+                self._saved = None
+
+    @contextmanager
+    def suspended(self):
+        if self._saved is None:
+            yield
+            return
+        fd = sys.stdin.fileno()
+        termios.tcsetattr(fd, termios.TCSADRAIN, self._saved)
+        # keys typed before the prompt must not act after it
+        self._buf.clear()
+        try:
+            yield
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, self._raw_attrs(self._saved))
+
+    def _fill(self, timeout: Optional[float]):
+        """Wait up to `timeout` seconds (None: until a key) and queue everything that is pending."""
+        if os.name == 'nt':
+            if timeout is None:
+                self._buf.append(msvcrt.getwch())
+            else:
+                end = time.monotonic() + timeout
+                while not msvcrt.kbhit() and time.monotonic() < end:
+                    time.sleep(0.01)
+            while msvcrt.kbhit():
+                self._buf.append(msvcrt.getwch())
+            return
+        fd = sys.stdin.fileno()
+        # outside a session a read still gets raw mode, just for this read
+        with self.session():
+            wait = timeout
+            while select.select([fd], [], [], wait)[0]:
+                data = os.read(fd, 1024)
+                if not data:
+                    # stdin closed: behave like Ctrl-C so the views unwind
+                    self._buf.append('\x03')
+                    return
+                self._buf.extend(self._decoder.decode(data))
+                wait = 0
+
+    def getch(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Next character; None when `timeout` passes without one."""
+        if not self._buf:
+            self._fill(timeout)
+        return self._buf.popleft() if self._buf else None
+
+    def ready(self, timeout: float = 0) -> bool:
+        if not self._buf:
+            self._fill(timeout)
+        return bool(self._buf)
+
+    def mark(self):
+        return tuple(self._buf)
+
+    def reset(self, mark):
+        self._buf = deque(mark)
+
+
+_KEYS = _KeyReader()
+
+
+def _raw_keys(func):
+    """Run an interactive view in one raw-mode session instead of switching modes per key."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _KEYS.session():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _getch():
+    return _KEYS.getch()
+
+
+def _prompt(text: str = '') -> str:
+    """input() with the terminal in normal mode, also inside a raw-mode view."""
+    with _KEYS.suspended():
+        return input(text)
+
+
+def _key_ready(timeout: float) -> bool:
+    """True as soon as a key press is waiting, False after `timeout` seconds without one."""
+    return _KEYS.ready(timeout)
 
 # last printable character read by _get_key when it returns 'OTHER'
 _LAST_CHAR = None
@@ -68,30 +215,24 @@ def _get_key():
         return 'OTHER'
     # Unix: arrows are '\x1b[A' '\x1b[B'
     if c == '\x1b':
-        # try to read rest non-blocking
-        c2 = _getch()
-        if c2 == '[':
+        # read the rest of the sequence if it is already queued; otherwise a plain ESC
+        c2 = _KEYS.getch(ESC_SEQUENCE_TIMEOUT)
+        if c2 is not None and c2 not in ('[', 'O'):
+            # ESC followed by an ordinary key: that key is read next
+            _KEYS.reset((c2,) + _KEYS.mark())
+        elif c2 is not None:
             # Could be arrow (A/B) or page (5~/6~) sequences
-            c3 = _getch()
+            c3 = _KEYS.getch(ESC_SEQUENCE_TIMEOUT)
             if c3 == 'A':
                 return 'UP'
             if c3 == 'B':
                 return 'DOWN'
-            if c3 == '5':
+            if c3 in ('5', '6'):
                 # consume the trailing '~' if present
-                try:
-                    c4 = _getch()
-                    if c4 == '~':
-                        return 'PAGEUP'
-                except Exception:
-                    return 'PAGEUP'
-            if c3 == '6':
-                try:
-                    c4 = _getch()
-                    if c4 == '~':
-                        return 'PAGEDOWN'
-                except Exception:
-                    return 'PAGEDOWN'
+                c4 = _KEYS.getch(ESC_SEQUENCE_TIMEOUT)
+                if c4 is not None and c4 != '~':
+                    _KEYS.reset((c4,) + _KEYS.mark())
+                return 'PAGEUP' if c3 == '5' else 'PAGEDOWN'
         return 'ESC'
     if c == '\r' or c == '\n':
         _LAST_CHAR = None
@@ -103,6 +244,76 @@ def _get_key():
     return 'OTHER'
 
 
+def _get_nav_key():
+    """Like `_get_key`, but returns (key, count): identical navigation keys that are
+    already queued (auto-repeat, fast scrolling) are merged into one move, so the
+    view repaints once per burst instead of once per key."""
+    global _LAST_CHAR
+    key = _get_key()
+    count = 1
+    if key in NAV_KEYS:
+        while _KEYS.ready(0):
+            mark = _KEYS.mark()
+            if _get_key() != key:
+                # a different key: leave it queued for the next read
+                _KEYS.reset(mark)
+                _LAST_CHAR = None
+                break
+            count += 1
+    return key, count
+
+
+def _clear_screen():
+    # ANSI home + clear; no `cls`/`clear` subprocess per redraw
+    sys.stdout.write('\033[H\033[2J')
+    sys.stdout.flush()
+
+
+class _FrameRenderer:
+    """Draw full-screen views by rewriting only the lines that changed since the previous frame.
+
+    The first frame (and the first after `invalidate()` or a terminal resize)
+    clears the screen with ANSI codes instead of spawning `cls`/`clear`; later
+    frames move the cursor to each changed line and overwrite it. Call
+    `invalidate()` whenever something else printed over the view (prompts,
+    nested menus), so the next frame is drawn in full.
+    """
+
+    def __init__(self):
+        self._prev: Optional[List[str]] = None
+        self._size = None
+
+    def invalidate(self):
+        self._prev = None
+
+    def render(self, lines: List[str]):
+        size = shutil.get_terminal_size()
+        if size != self._size:
+            self._size = size
+            self._prev = None
+        # keep the last row free for the parked cursor; a taller frame would scroll and misplace every line
+        lines = lines[:max(1, size.lines - 1)]
+        out = []
+        if self._prev is None:
+            _clear_screen()
+            prev = []
+        else:
+            prev = self._prev
+        for i, line in enumerate(lines):
+            if i >= len(prev) or prev[i] != line:
+                # erase first: erasing after a full-width line would also wipe its last column
+                out.append(f'\033[{i + 1};1H\033[2K{line}')
+        # the previous frame was longer: blank its remaining lines
+        for i in range(len(lines), len(prev)):
+            out.append(f'\033[{i + 1};1H\033[2K')
+        # park the cursor below the frame so prompts printed afterwards start there
+        out.append(f'\033[{len(lines) + 1};1H')
+        sys.stdout.write(''.join(out))
+        sys.stdout.flush()
+        self._prev = list(lines)
+
+
+@_raw_keys
 def show_menu(title: str, options: List[str]) -> int:
     """Interactive selector. Returns selected index."""
     selection = 0
@@ -114,13 +325,8 @@ def show_menu(title: str, options: List[str]) -> int:
     except Exception:
         window_height = 24
         window_width = 80
-    list_height = max(5, window_height - 6)
-
-    def clear():
-        if os.name == 'nt':
-            os.system('cls')
-        else:
-            os.system('clear')
+    base_list_height = max(5, window_height - 6)
+    renderer = _FrameRenderer()
 
     # Hide cursor while the interactive menu runs (best-effort)
     try:
@@ -130,20 +336,24 @@ def show_menu(title: str, options: List[str]) -> int:
 
     try:
         while True:
+            # status lines of background scans take rows from the bottom of the list
+            status = list(_SCAN_STATUS)
+            list_height = max(3, base_list_height - (len(status) + 1 if status else 0))
             if selection < scroll_offset:
                 scroll_offset = selection
             elif selection >= scroll_offset + list_height:
                 scroll_offset = selection - list_height + 1
 
-            clear()
             # Header styling aligned with toolkit.ps1: left-justified cyan title, dim subtitle, gray separator
             header_icon = ICONS.get('db', '') + ' ' if 'ICONS' in globals() else ''
             w = max(10, window_width - 1)
             title_line = f"{header_icon}{title}".ljust(w)
             subtitle = "Gebruik pijltjes om te navigeren, Enter om te selecteren.".ljust(w)
-            print("\033[36m" + title_line + "\033[0m")
-            print("\033[37m" + subtitle + "\033[0m")
-            print("\033[37m" + ("-" * w) + "\033[0m")
+            lines = [
+                "\033[36m" + title_line + "\033[0m",
+                "\033[37m" + subtitle + "\033[0m",
+                "\033[37m" + ("-" * w) + "\033[0m",
+            ]
 
             for i in range(list_height):
                 idx = scroll_offset + i
@@ -156,23 +366,29 @@ def show_menu(title: str, options: List[str]) -> int:
                     text = f"{prefix}{options[idx]}"
                     if len(text) > window_width:
                         text = text[:window_width-1]
-                    print(color + text.ljust(window_width) + '\033[0m')
+                    lines.append(color + text.ljust(window_width - 1) + '\033[0m')
                 else:
-                    print('')
+                    lines.append('')
+            if status:
+                lines.append("\033[37m" + ("-" * w) + "\033[0m")
+                for line in status:
+                    lines.append("\033[33m" + line[:window_width - 1] + "\033[0m")
+            renderer.render(lines)
+
+            # a scan still writing exports appends status lines: repaint them without waiting for a key
+            if any(t.is_alive() for _, _, t in _SCAN_CHILDREN) and not _key_ready(SCAN_STATUS_POLL_SECONDS):
+                continue
 
             try:
-                key = _get_key()
+                key, count = _get_nav_key()
             except KeyboardInterrupt:
                 # Treat Ctrl-C as a graceful cancel and return to previous menu
                 break
+            # wraps around at both ends, also for a merged burst of key repeats
             if key == 'UP':
-                selection -= 1
-                if selection < 0:
-                    selection = len(options) - 1
+                selection = (selection - count) % len(options)
             elif key == 'DOWN':
-                selection += 1
-                if selection >= len(options):
-                    selection = 0
+                selection = (selection + count) % len(options)
             elif key == 'ENTER':
                 return selection
     except KeyboardInterrupt:
@@ -274,11 +490,12 @@ if not DB_PASSWORD:
     DB_PASSWORD = getpass.getpass("DB password: ")
 
 
-def create_connection(database: Optional[str] = None, host: Optional[str] = None):
+def create_connection(database: Optional[str] = None, host: Optional[str] = None, quiet: bool = False):
     """Create a MySQL connection.
 
     If `host` is provided, try only that host. Otherwise try hosts from
-    `DB_HOST` and `DB_HOST2` in order.
+    `DB_HOST` and `DB_HOST2` in order. `quiet` suppresses the failure
+    messages (background threads must not print over the menu).
     """
     # If caller passed a combined 'host/schema' in the database parameter,
     # split it. Always normalise so `database` contains only the schema name.
@@ -313,13 +530,15 @@ def create_connection(database: Optional[str] = None, host: Optional[str] = None
                     return conn
             except mysql.connector.Error as e:
                 last_err = e
-                print(f"Connection attempt {attempt+1} to {h} failed: {e}")
+                if not quiet:
+                    print(f"Connection attempt {attempt+1} to {h} failed: {e}")
                 time.sleep(RETRY_SLEEP)
-    print(f"Unable to connect to any host. Last error: {last_err}")
+    if not quiet:
+        print(f"Unable to connect to any host. Last error: {last_err}")
     return None
 
 
-def fetch_databases() -> List[str]:
+def fetch_databases(quiet: bool = False) -> List[str]:
     """Return a list of databases from all configured hosts.
 
     Each item is returned as "host/database" so the UI can select which host
@@ -330,7 +549,7 @@ def fetch_databases() -> List[str]:
         hosts = ["localhost"]
     dbs: List[str] = []
     for h in hosts:
-        conn = create_connection(host=h)
+        conn = create_connection(host=h, quiet=quiet)
         if not conn:
             continue
         try:
@@ -348,6 +567,82 @@ def fetch_databases() -> List[str]:
     return dbs
 
 
+# how often an open chooser looks for a list revalidated in the background
+LIST_POLL_SECONDS = 0.25
+
+
+class _DatabaseList:
+    """The `host/schema` list of the menu: the cached copy first, revalidated in the background.
+
+    When a revalidation finds added or removed schemas, `names` is updated in
+    place, `index` replaced and `version` incremented, so an open chooser can
+    pick up the new list.
+    """
+
+    def __init__(self):
+        self.hosts = [h for h in (DB_HOST, DB_HOST2) if h] or ["localhost"]
+        self.names: List[str] = []
+        self.index = DatabaseIndex([])
+        self.version = 0
+        self.age = None
+        self._lock = threading.Lock()
+        self._thread = None
+        try:
+            cached, self.age = load_database_list(self.hosts)
+        except Exception as e:
+            print(f"Database list cache not readable ({e}); fetching from the servers")
+            cached = []
+        if cached:
+            self._set(cached)
+
+    @property
+    def stale(self) -> bool:
+        return self.age is None or self.age > DATABASE_LIST_TTL
+
+    @property
+    def revalidating(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _set(self, names: List[str]):
+        index = DatabaseIndex(names)
+        with self._lock:
+            self.names[:] = names
+            self.index = index
+            self.version += 1
+
+    def _save(self, names: List[str]):
+        try:
+            save_database_list(self.hosts, names)
+        except Exception as e:
+            _SCAN_STATUS.append(f"Databaselijst niet opgeslagen: {e}")
+
+    def fetch(self) -> List[str]:
+        """Fetch the list now (no usable cache) and store it."""
+        names = fetch_databases()
+        if names:
+            self._set(names)
+            self._save(names)
+        return self.names
+
+    def revalidate_async(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._revalidate, name="db-list-revalidate", daemon=True)
+            self._thread.start()
+
+    def _revalidate(self):
+        names = fetch_databases(quiet=True)
+        if not names:
+            _SCAN_STATUS.append("Databaselijst: servers niet bereikbaar, lijst uit cache blijft in gebruik")
+            return
+        added = set(names) - set(self.names)
+        removed = set(self.names) - set(names)
+        # also when nothing changed: restamps the cache for another TTL
+        self._save(names)
+        if added or removed:
+            self._set(names)
+            _SCAN_STATUS.append(f"Databaselijst bijgewerkt: {len(added)} nieuw, {len(removed)} verdwenen")
+
+
 def list_bridges(database: str, host: Optional[str] = None) -> List[Dict]:
     conn = create_connection(database, host=host)
     if not conn:
@@ -366,7 +661,233 @@ def list_bridges(database: str, host: Optional[str] = None) -> List[Dict]:
         cur.close()
         conn.close()
 
+# rows per keyset page of the bridge table view
+TABLE_PAGE_SIZE = 200
+# auto-refresh ('r') of the bridge table view: poll interval and how long changed rows stay highlighted
+AUTO_REFRESH_SECONDS = 5
+HIGHLIGHT_SECONDS = 15
+# health columns: bridges per comlog aggregate, and how often the view looks for new results
+HEALTH_CHUNK_SIZE = 200
+HEALTH_POLL_SECONDS = 0.25
+
+
+class _BridgePager:
+    """Rows of a bridge query loaded page by page, keyset-paginated on `inbridgeid`.
+
+    The first page is read on the caller's cursor. Later pages are read by a
+    background thread on its own connection whenever `want(n)` asks for more
+    rows than are loaded; `rows` only grows. `query` must select `inbridgeid`
+    as its first column and have no WHERE/ORDER BY of its own.
+    """
+
+    def __init__(self, cur, query: str, database: str, host: Optional[str] = None, page_size: int = TABLE_PAGE_SIZE):
+        self.query = query
+        self.database = database
+        self.host = host
+        self.page_size = page_size
+        self.rows: List[tuple] = []
+        self.cols: List[str] = []
+        self.done = False
+        self.error = None
+        self._target = 0
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+        self._append(self._fetch_page(cur, None))
+
+    def _fetch_page(self, cur, after_id):
+        if after_id is None:
+            cur.execute(f"{self.query} ORDER BY inbridgeid LIMIT %s", (self.page_size,))
+        else:
+            cur.execute(f"{self.query} WHERE inbridgeid > %s ORDER BY inbridgeid LIMIT %s", (after_id, self.page_size))
+        page = cur.fetchall()
+        if not self.cols and cur.description:
+            self.cols.extend(d[0] for d in cur.description)
+        return page
+
+    def _append(self, page):
+        with self._cond:
+            self.rows.extend(page)
+            if len(page) < self.page_size:
+                self.done = True
+            self._cond.notify_all()
+
+    def want(self, n: int):
+        """Ask for at least `n` rows; returns at once, the pages are read in the background."""
+        with self._cond:
+            if self.done or n <= len(self.rows):
+                return
+            self._target = max(self._target, n)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"pager-{self.database}", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def wait_for(self, n: int, timeout: float = 30):
+        """Block until `n` rows are loaded, all rows are loaded, or `timeout` passes."""
+        self.want(n)
+        with self._cond:
+            self._cond.wait_for(lambda: self.done or len(self.rows) >= n, timeout)
+
+    def retain(self, keep):
+        """Drop loaded rows for which `keep(row)` is false, under the lock the page thread uses."""
+        with self._cond:
+            self.rows[:] = [r for r in self.rows if keep(r)]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        # quiet: connection errors would print over the table; they show up in the title instead
+        conn = None
+        try:
+            conn = mysql.connector.connect(host=self.host or DB_HOST or "localhost", user=DB_USER, password=DB_PASSWORD,
+                                           database=self.database, connect_timeout=10)
+            cur = conn.cursor()
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed or self._target > len(self.rows))
+                    if self._closed or self.done:
+                        return
+                    after_id = self.rows[-1][0]
+                self._append(self._fetch_page(cur, after_id))
+        except Exception as e:
+            # any failure ends loading, otherwise wait_for() callers stall on a dead thread
+            with self._cond:
+                self.error = str(e)
+                self.done = True
+                self._cond.notify_all()
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+class _HealthLoader:
+    """Restarts and max comlog gap per bridge, computed by a background thread.
+
+    Works through the ids in `rows` (the view's list; it may grow or change
+    while loading) that have no value yet: all at once from the local rollups
+    when the schema has them, else in chunks of HEALTH_CHUNK_SIZE with the
+    SQL aggregate of bridge_health. `values` maps inbridgeid ->
+    (restarts, max gap); `version` counts the updates.
+    """
+
+    def __init__(self, rows: List[tuple], database: str, host: Optional[str] = None, days: int = HEALTH_DAYS):
+        self.rows = rows
+        self.database = database
+        self.host = host
+        self.days = days
+        self.values: Dict[object, tuple] = {}
+        self.version = 0
+        self.source = None  # 'rollups' or 'comlog' once known
+        self.error = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"health-{database}", daemon=True)
+        self._thread.start()
+
+    def _pending(self) -> List:
+        # list(): the view may replace rows while this thread reads them
+        return [r[0] for r in list(self.rows) if r[0] not in self.values]
+
+    def known(self) -> set:
+        """Snapshot of the ids that have values."""
+        with self._cond:
+            return set(self.values)
+
+    def missing(self) -> bool:
+        """True while loaded rows still wait for their values (False after an error)."""
+        return self.error is None and not self._closed and bool(self._pending())
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        # quiet like _BridgePager: errors show up in the title
+        conn = None
+        try:
+            host = self.host or DB_HOST or "localhost"
+            conn = mysql.connector.connect(host=host, user=DB_USER, password=DB_PASSWORD,
+                                           database=self.database, connect_timeout=10)
+            from_rollups = health_from_rollups(conn, self.database, host, self.days)
+            self.source = 'comlog' if from_rollups is None else 'rollups'
+            while True:
+                with self._cond:
+                    # rows can arrive later (pages, auto-refresh); look again now and then
+                    self._cond.wait_for(lambda: self._closed or self._pending(), timeout=1)
+                    if self._closed:
+                        return
+                    pending = self._pending()
+                if not pending:
+                    continue
+                if from_rollups is not None:
+                    found = from_rollups
+                else:
+                    pending = pending[:HEALTH_CHUNK_SIZE]
+                    found = health_from_comlog(conn, pending, self.days)
+                    # next chunk reads the comlog as it is then
+                    conn.rollback()
+                with self._cond:
+                    # bridges without comlog messages in the window: no restarts, no gap
+                    self.values.update({i: found.get(i, (0, None)) for i in pending})
+                    self.version += 1
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+# Details action of the table view: (host, schema, inbridgeid) -> drill-down, kept for DETAILS_TTL
+_DETAILS_CACHE = DetailsCache()
+
+
+def _print_bridge_details(conn, cur, database: str, inbridgeid: int, host: Optional[str] = None):
+    """Print restarts, recent comlog and device counts of a bridge; cached, else one query on `cur`."""
+    key = (host, database, inbridgeid)
+    cached = _DETAILS_CACHE.get(key)
+    if cached is None:
+        try:
+            # end the read transaction, otherwise the query sees the view's first snapshot
+            conn.rollback()
+            details = fetch_bridge_details(cur, inbridgeid)
+        except mysql.connector.Error as e:
+            print(f"\nGeen restarts/comlog beschikbaar: {e}")
+            return
+        _DETAILS_CACHE.put(key, details)
+        note = ''
+    else:
+        details, age = cached
+        note = f"  (cache, {int(age)}s oud)"
+    width = shutil.get_terminal_size((80, 24)).columns
+    print(f"\nDevices: {details['devices']}, slavedevices: {details['slavedevices']}{note}")
+    print(f"\nRecente restarts (laatste {DETAILS_RESTARTS}):")
+    if details['restarts']:
+        print(f"{'timestamp':<20} {'ip_address':<15} {'starttime':<20}")
+        for ts, ip, start in details['restarts']:
+            print(f"{str(ts):<20} {str(ip):<15} {str(start):<20}")
+    else:
+        print("  (geen)")
+    print(f"\nLaatste {DETAILS_COMLOG_LINES} comlog-regels:")
+    if details['comlog']:
+        for _, ts, comment in details['comlog']:
+            print(f"{str(ts):<20} {comment}"[:width - 1])
+    else:
+        print("  (geen)")
+
+
 # Add: pretty columned listing (from list_bridges_prompt) keeping selector style
+@_raw_keys
 def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
     """Interactive table view of `inbridge` for a database.
 
@@ -395,20 +916,47 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
             "FROM inbridge"
         )
 
-        def load_rows():
-            cur.execute(query)
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description] if cur.description else []
-            return rows, cols
-
-        rows, cols = load_rows()
+        # first page only; the rest is read in the background as the user scrolls
+        pager = _BridgePager(cur, query, database, host=host)
+        rows, cols = pager.rows, pager.cols
         if not rows:
             print("(no bridges)")
             return
 
+        # health columns follow the inbridge columns; restarts and max gap are filled in
+        # by a background loader (placeholder until then), poll-fail % comes from the row
+        n_data = len(cols)
+        cols = cols + list(HEALTH_COLUMNS)
+        pollfail_col = n_data + HEALTH_COLUMNS.index('fail %')
+        poll_idx = cols.index('polling') if 'polling' in cols else None
+        fail_idx = cols.index('pollfailure') if 'pollfailure' in cols else None
+        health = _HealthLoader(rows, database, host=host)
+        health_seen = health.version
+        # ids whose health values are in the layout's row lines
+        health_shown = set()
+
         def fmt_val(v):
             return "NULL" if v is None else str(v)
 
+        def cell(row, j):
+            """Value of column `j` of `row`, health columns included (None while not loaded)."""
+            if j < n_data:
+                return row[j]
+            if j == pollfail_col:
+                if poll_idx is None or fail_idx is None:
+                    return None
+                return pollfail_pct(row[poll_idx], row[fail_idx])
+            value = health.values.get(row[0])
+            return None if value is None else value[j - n_data]
+
+        def fmt_cell(row, j):
+            if j < n_data:
+                return fmt_val(row[j])
+            if j != pollfail_col and row[0] not in health.values:
+                return '...'
+            v = cell(row, j)
+            return '-' if v is None else str(v)
+
         # compute column widths and cap to avoid overflow
         def compute_col_widths(rows):
             max_width = 100
@@ -436,7 +984,7 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
             for i, col in enumerate(cols):
                 max_len = len(str(col))
                 for r in rows:
-                    vlen = len(fmt_val(r[i]))
+                    vlen = len(fmt_cell(r, i))
                     if vlen > max_len:
                         max_len = vlen
 
@@ -461,43 +1009,38 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
                 col_widths.append(max_len)
             return col_widths
 
-        col_widths = compute_col_widths(rows)
-        # Enforce per-column minima (defensive): if compute_col_widths missed a min,
-        # make sure important columns like `bridgetype` get their minimum width.
-        enforced = []
-        for col in cols:
-            cname = str(col).lower()
-            if 'location' in cname or 'comment' in cname:
-                enforced.append(12)
-            elif 'last changed' in cname or 'changetimestamp' in cname:
-                enforced.append(19)
-            elif 'bridgetype' in cname:
-                enforced.append(30)
-            elif 'sw version' in cname or 'swversion' in cname:
-                enforced.append(8)
-            elif 'pollfailure' in cname:
-                enforced.append(3)
-            elif 'polling' in cname:
-                enforced.append(3)
-            elif 'ip' in cname or 'localip' in cname or 'ip-address' in cname:
-                enforced.append(15)
-            elif 'mac' in cname or 'hostname' in cname or 'macaddress' in cname:
-                enforced.append(14)
-            elif 'id' == cname:
-                enforced.append(4)
-            else:
-                enforced.append(6)
-        for i in range(min(len(col_widths), len(enforced))):
-            if col_widths[i] < enforced[i]:
-                col_widths[i] = enforced[i]
-
-        try:
-            term_size = shutil.get_terminal_size()
-            window_height = term_size.lines
-            window_width = term_size.columns
-        except Exception:
-            window_height = 24
-            window_width = 80
+        def table_widths(rows, window_width):
+            col_widths = compute_col_widths(rows)
+            # Enforce per-column minima (defensive): if compute_col_widths missed a min,
+            # make sure important columns like `bridgetype` get their minimum width.
+            enforced = []
+            for col in cols:
+                cname = str(col).lower()
+                if 'location' in cname or 'comment' in cname:
+                    enforced.append(12)
+                elif 'last changed' in cname or 'changetimestamp' in cname:
+                    enforced.append(19)
+                elif 'bridgetype' in cname:
+                    enforced.append(30)
+                elif 'sw version' in cname or 'swversion' in cname:
+                    enforced.append(8)
+                elif 'pollfailure' in cname:
+                    enforced.append(3)
+                elif 'polling' in cname:
+                    enforced.append(3)
+                elif 'ip' in cname or 'localip' in cname or 'ip-address' in cname:
+                    enforced.append(15)
+                elif 'mac' in cname or 'hostname' in cname or 'macaddress' in cname:
+                    enforced.append(14)
+                elif 'id' == cname:
+                    enforced.append(4)
+                else:
+                    enforced.append(6)
+            for i in range(min(len(col_widths), len(enforced))):
+                if col_widths[i] < enforced[i]:
+                    col_widths[i] = enforced[i]
+            # Adjust computed widths to fit the current window
+            return adjust_col_widths_to_window(col_widths, window_width)
 
         def adjust_col_widths_to_window(col_widths, window_width, prefix_len=3):
             # Ensure the total printed width (including separators) fits the window.
@@ -603,70 +1146,38 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
             # debug instrumentation removed
             return new_widths
 
-        # Adjust computed widths to fit the current window
-        col_widths = adjust_col_widths_to_window(col_widths, window_width)
-        list_height = max(5, window_height - 8)
-
-        selection = 0
-        scroll_offset = 0
-
-        def clear():
-            if os.name == 'nt':
-                os.system('cls')
-            else:
-                os.system('clear')
-
-        while True:
-            # include a trailing Back sentinel so user can select it
-            display_rows = list(rows) + [None]
-            total = len(display_rows)
-
-            if selection < scroll_offset:
-                scroll_offset = selection
-            elif selection >= scroll_offset + list_height:
-                scroll_offset = selection - list_height + 1
+        def build_layout(rows, col_widths, window_width):
+            """Header lines and, per row, its padded line(s) without selection prefix or colour.
 
-            clear()
-            print(f"\033[36mCustomers Bridges - {database}\033[0m")
-            # brief help about navigation keys
-            print("\033[37mPageUp/PgDn: jump a page. Press 'b' to back.\033[0m")
+            Built once per data load and terminal width; redraws only slice it.
+            Rows whose location wraps have two lines.
+            """
+            loc_idx = None
+            br_idx = None
+            for ci, cname in enumerate(cols):
+                lc = str(cname).lower()
+                if 'location' in lc or 'comment' in lc:
+                    loc_idx = ci
+                if 'bridgetype' in lc:
+                    br_idx = ci
             # header (include left padding so data columns align with prefixed rows)
             header_prefix = '   '
             # Truncate header text to the column width before padding to avoid overflow
             header_cells = [str(col)[:col_widths[i]].ljust(col_widths[i]) for i, col in enumerate(cols)]
-            print(header_prefix + " | ".join(header_cells))
             underline = ["-" * w for w in col_widths]
-            print(header_prefix + "-|-".join(underline))
-
-            visible = display_rows[scroll_offset: scroll_offset + list_height]
-            for i, row in enumerate(visible):
-                idx = scroll_offset + i
-                prefix = '   '
-                color = '\033[37m'
-                if idx == selection:
-                    prefix = '-> '
-                    color = '\033[32m'
-
-                if row is None:
-                    # render Back row
-                    text = prefix + '<Back>'
-                    print(color + text.ljust(window_width) + '\033[0m')
-                    continue
-
-                # Build row cells, with special handling for the `location` column
-                loc_idx = None
-                for ci, cname in enumerate(cols):
-                    lc = str(cname).lower()
-                    if 'location' in lc or 'comment' in lc:
-                        loc_idx = ci
-                    if 'bridgetype' in lc:
-                        br_idx = ci
-                    # don't break; want to find both indices if present
-
+            # one column short of the width, like the other views: a full-width line can leave
+            # the cursor in the terminal's pending-wrap state
+            header = ((header_prefix + " | ".join(header_cells))[:window_width - 1],
+                      (header_prefix + "-|-".join(underline))[:window_width - 1])
+
+            # room after the 3-char selection prefix; trimming here keeps header alignment
+            body_width = max(0, window_width - 4)
+            row_lines = []
+            for row in rows:
                 # prepare cell strings (truncated where appropriate)
                 base_cells = []
-                for j, cell in enumerate(row):
-                    s = fmt_val(cell)
+                for j in range(len(cols)):
+                    s = fmt_cell(row, j)
                     # For bridgetype prefer direct cut (no ellipsis) so it's fully visible when possible
                     if j == br_idx and len(s) > col_widths[j]:
                         s = s[:col_widths[j]]
@@ -687,18 +1198,9 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
                         continuation = rest
                         base_cells[loc_idx] = first_part
 
-                # Now build printable cells (pad to widths) and print in a consistent way
                 padded_cells = [base_cells[k].ljust(col_widths[k])[:col_widths[k]] for k in range(len(base_cells))]
-
-                # Build the single-line representation and ensure it matches header widths
-                line = prefix + ' | '.join(padded_cells)
-                # If it somehow exceeds the window, trim the right side (should be rare
-                # because widths were adjusted earlier) while keeping header alignment
-                if len(line) > window_width:
-                    line = line[:window_width]
-                print(color + line.ljust(window_width) + '\033[0m')
-
-                # If we have a continuation for the location, print a secondary line
+                out = [' | '.join(padded_cells)[:body_width].ljust(body_width)]
+                # If we have a continuation for the location, add a secondary line
                 if continuation is not None:
                     blanks = []
                     for k in range(len(padded_cells)):
@@ -706,13 +1208,250 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
                             blanks.append(continuation.ljust(col_widths[k])[:col_widths[k]])
                         else:
                             blanks.append(' ' * col_widths[k])
-                    cont_line = prefix + ' | '.join(blanks)
-                    if len(cont_line) > window_width:
-                        cont_line = cont_line[:window_width]
-                    print(color + cont_line.ljust(window_width) + '\033[0m')
+                    out.append(' | '.join(blanks)[:body_width].ljust(body_width))
+                row_lines.append(tuple(out))
+            return header, row_lines
+
+        selection = 0
+        scroll_offset = 0
+        renderer = _FrameRenderer()
+        # (header, row lines) for the loaded rows and terminal width; None after a refresh.
+        # Widths are provisional: measured on the rows loaded at (re)build time, later pages
+        # are laid out with them and only a refresh or resize measures again.
+        layout = None
+        window_width = None
+
+        # Filter ('/') and sort ('s') work on precomputed data only, no new queries:
+        # `filter_index` holds the lowercased MAC/location/status text per row and
+        # `rank_cache` dense ranks per sorted column. `view` lists the row indices
+        # shown, in order (None: all loaded rows in load order). While pages still load,
+        # the view covers the loaded rows and is redone as more arrive (`view_loaded`).
+        filter_cols = [i for i, c in enumerate(cols) if str(c).lower() in ('macaddress', 'location', 'status')]
+        filter_index: List[str] = []
+        rank_cache: Dict[int, list] = {}
+        filter_text = ''
+        filter_edit = False
+        sort_keys: List[tuple] = []  # (column index, descending), primary key first
+        view = None
+        view_loaded = 0
+
+        # Auto-refresh ('r'): per interval only rows with a newer changetimestamp are read and
+        # merged into `rows` and the layout; COUNT/MAX(inbridgeid) changes trigger an id scan
+        # to drop deleted bridges. `highlight` maps inbridgeid -> time it last changed.
+        ts_idx = cols.index('last changed') if 'last changed' in cols else None
+        auto_refresh = False
+        refresh_due = 0.0
+        refresh_note = ''
+        last_seen = None
+        table_state = None
+        highlight: Dict[object, float] = {}
+
+        def drop_rows(keep_ids=None, drop_ids=()):
+            """Remove rows locally (deleted bridges) and rebuild the derived state."""
+            nonlocal layout, selection
+            # through the pager: its thread may be appending a page or reading the last id
+            pager.retain(lambda r: (keep_ids is None or r[0] in keep_ids) and r[0] not in drop_ids)
+            layout = None
+            filter_index.clear()
+            rank_cache.clear()
+            apply_view()
+            selection = min(selection, max(0, (len(rows) if view is None else len(view)) - 1))
+
+        def poll_changes():
+            """Merge rows changed since `last_seen` and drop deleted ones; one indexed query when nothing was deleted."""
+            nonlocal last_seen, table_state
+            # end the read transaction, otherwise every SELECT sees the snapshot of the first one
+            conn.rollback()
+            cur.execute(f"{query} WHERE changetimestamp >= %s ORDER BY inbridgeid", (last_seen,))
+            changed = cur.fetchall()
+            cur.execute("SELECT COUNT(*), MAX(inbridgeid) FROM inbridge")
+            state = tuple(cur.fetchone())
+            now = time.monotonic()
+            for bid in [b for b, t in highlight.items() if now - t >= HIGHLIGHT_SECONDS]:
+                del highlight[bid]
+            pos = {r[0]: i for i, r in enumerate(rows)}
+            merged = False
+            for row in changed:
+                if row[ts_idx] is not None and row[ts_idx] > last_seen:
+                    last_seen = row[ts_idx]
+                i = pos.get(row[0])
+                if i is None:
+                    # new bridge; while pages are still loading the pager will bring it
+                    if pager.done:
+                        rows.append(row)
+                        highlight[row[0]] = now
+                        merged = True
+                    continue
+                # >= also returns rows already merged in the same second; only real changes count
+                if tuple(rows[i]) == tuple(row):
+                    continue
+                rows[i] = row
+                if layout is not None and i < len(layout[1]):
+                    layout[1][i] = build_layout([row], col_widths, window_width)[1][0]
+                if i < len(filter_index):
+                    filter_index[i] = ' '.join(fmt_val(row[j]) for j in filter_cols).lower()
+                highlight[row[0]] = now
+                merged = True
+            if merged:
+                rank_cache.clear()
+                apply_view()
+            if state != table_state:
+                if table_state is not None:
+                    # count or highest id moved: compare ids (index-only) to find deleted bridges
+                    cur.execute("SELECT inbridgeid FROM inbridge")
+                    ids = {r[0] for r in cur.fetchall()}
+                    if any(r[0] not in ids for r in rows):
+                        drop_rows(keep_ids=ids)
+                table_state = state
+
+        def start_auto_refresh():
+            nonlocal last_seen, table_state
+            stamps = [r[ts_idx] for r in rows if r[ts_idx] is not None]
+            last_seen = max(stamps) if stamps else datetime.min
+            table_state = None
+            poll_changes()
+
+        def extend_filter_index():
+            for row in rows[len(filter_index):]:
+                filter_index.append(' '.join(fmt_val(row[j]) for j in filter_cols).lower())
+
+        def column_ranks(j):
+            """Dense ranks of column `j` over the loaded rows; None for NULL values."""
+            if len(rank_cache.get(j, ())) != len(rows):
+                present = [i for i in range(len(rows)) if cell(rows[i], j) is not None]
+                value = lambda i: cell(rows[i], j)
+                try:
+                    present.sort(key=value)
+                except TypeError:
+                    # mixed types in one column: compare as text
+                    value = lambda i: str(cell(rows[i], j))
+                    present.sort(key=value)
+                ranks = [None] * len(rows)
+                rank = 0
+                prev = object()
+                for i in present:
+                    v = value(i)
+                    if v != prev:
+                        rank += 1
+                        prev = v
+                    ranks[i] = rank
+                rank_cache[j] = ranks
+            return rank_cache[j]
+
+        def apply_view(refine=False):
+            """Recompute `view`; with `refine` only the current view is filtered (the filter text grew)."""
+            nonlocal view, view_loaded
+            if not filter_text and not sort_keys:
+                view = None
+                return
+            if not pager.done:
+                # filter and sort cover every bridge: read the remaining pages in the background
+                pager.want(sys.maxsize)
+            view_loaded = len(rows)
+            extend_filter_index()
+            terms = filter_text.lower().split()
+            if refine and view is not None:
+                view = [i for i in view if all(t in filter_index[i] for t in terms)]
+                return
+            idxs = [i for i in range(len(rows)) if all(t in filter_index[i] for t in terms)]
+            if sort_keys:
+                ranked = [(column_ranks(j), desc) for j, desc in sort_keys]
+                # NULLs last in both directions
+                idxs.sort(key=lambda i: tuple(
+                    (True, 0) if r[i] is None else (False, -r[i] if desc else r[i]) for r, desc in ranked
+                ))
+            view = idxs
+
+        while True:
+            size = shutil.get_terminal_size((80, 24))
+            if layout is None or size.columns != window_width:
+                window_width = size.columns
+                # taken before the build: values arriving during it are picked up below
+                health_shown = health.known()
+                col_widths = table_widths(rows, window_width)
+                layout = build_layout(rows, col_widths, window_width)
+            header_lines, row_lines = layout
+            if len(row_lines) < len(rows):
+                # pages loaded since the last redraw: lay out only the new rows
+                row_lines += build_layout(rows[len(row_lines):], col_widths, window_width)[1]
+            if health.version != health_seen:
+                # health values arrived: redo only the lines still showing the placeholder
+                health_seen = health.version
+                for i, row in enumerate(rows[:len(row_lines)]):
+                    if row[0] not in health_shown and row[0] in health.values:
+                        row_lines[i] = build_layout([row], col_widths, window_width)[1][0]
+                        health_shown.add(row[0])
+                for j in range(n_data, len(cols)):
+                    rank_cache.pop(j, None)
+                if any(j >= n_data for j, _ in sort_keys):
+                    apply_view()
+            extend_filter_index()
+            if view is not None and len(rows) > view_loaded:
+                # more pages arrived: filter/sort them in, keeping the selected bridge selected
+                sel_i = view[selection] if selection < len(view) else None
+                apply_view()
+                if view is not None and sel_i in view:
+                    selection = view.index(sel_i)
+            list_height = max(5, size.lines - 8)
+            shown = view if view is not None else range(len(rows))
+            # a trailing Back row (index len(shown)) so user can select it
+            total = len(shown) + 1
+
+            if selection < scroll_offset:
+                scroll_offset = selection
+            elif selection >= scroll_offset + list_height:
+                scroll_offset = selection - list_height + 1
+            if view is None:
+                # prefetch the next page once the screen gets within two pages of the loaded end
+                pager.want(scroll_offset + 3 * list_height)
+
+            count = f"{len(rows)} bridges" if pager.done else f"{len(rows)}+ bridges, meer laden bij scrollen"
+            if view is not None:
+                count = f"{len(view)} van {count}" if pager.done else f"{len(view)} van {len(rows)}+ bridges, laden…"
+            if pager.error:
+                count += f", laden gestopt: {pager.error}"
+            if health.error:
+                count += f", gezondheid niet beschikbaar: {health.error}"
+            elif health.missing():
+                count += f", gezondheid ({HEALTH_DAYS}d) laden"
+            if auto_refresh:
+                count += f", auto-refresh elke {AUTO_REFRESH_SECONDS}s"
+            if refresh_note:
+                count += f", {refresh_note}"
+            help_line = "PageUp/PgDn: jump a page. '/' filter, 's' sort, 'r' auto-refresh. Press 'b' to back."
+            if filter_edit or filter_text:
+                help_line = f"Filter (MAC/location/status): {filter_text}{'_' if filter_edit else ''}"
+                if filter_edit:
+                    help_line += "   Enter: klaar, Esc: wissen"
+            if sort_keys:
+                help_line += "   Sort: " + ", ".join(f"{cols[j]} {'desc' if desc else 'asc'}" for j, desc in sort_keys)
+            lines = [
+                "\033[36m" + f"Customers Bridges - {database} ({count})"[:window_width - 1] + "\033[0m",
+                # brief help about navigation keys
+                "\033[37m" + help_line[:window_width - 1] + "\033[0m",
+            ]
+            lines.extend(header_lines)
+
+            now = time.monotonic()
+            for idx in range(scroll_offset, min(total, scroll_offset + list_height)):
+                prefix = '   '
+                color = '\033[37m'
+                if idx == selection:
+                    prefix = '-> '
+                    color = '\033[32m'
+                if idx == len(shown):
+                    # render Back row
+                    lines.append(color + (prefix + '<Back>').ljust(window_width - 1) + '\033[0m')
+                    continue
+                changed_at = highlight.get(rows[shown[idx]][0])
+                if changed_at is not None and now - changed_at < HIGHLIGHT_SECONDS:
+                    # recently changed (auto-refresh): yellow, bold when selected
+                    color = '\033[1;33m' if idx == selection else '\033[33m'
+                for text in row_lines[shown[idx]]:
+                    lines.append(color + prefix + text + '\033[0m')
 
             # If the Back row is not visible, print a dedicated Back line at the bottom
-            back_index = len(rows)
+            back_index = len(shown)
             if not (scroll_offset <= back_index < scroll_offset + list_height):
                 # render a Back line (respect selection)
                 b_prefix = '   '
@@ -720,29 +1459,111 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
                 if selection == back_index:
                     b_prefix = '-> '
                     b_color = '\033[32m'
-                print(b_color + (b_prefix + '<Back>').ljust(window_width) + '\033[0m')
-
-            key = _get_key()
+                lines.append(b_color + (b_prefix + '<Back>').ljust(window_width - 1) + '\033[0m')
+            renderer.render(lines)
+
+            # a filtered/sorted view also redraws while the remaining pages load
+            view_loading = view is not None and not pager.done
+            if auto_refresh or health.missing() or view_loading:
+                # no key yet: poll for changes when due, redraw for health cells and pages that arrived
+                wait = max(0.0, refresh_due - time.monotonic()) if auto_refresh else HEALTH_POLL_SECONDS
+                if health.missing() or view_loading:
+                    wait = min(wait, HEALTH_POLL_SECONDS)
+                if not _key_ready(wait):
+                    if auto_refresh and time.monotonic() >= refresh_due:
+                        refresh_due = time.monotonic() + AUTO_REFRESH_SECONDS
+                        try:
+                            poll_changes()
+                        except mysql.connector.Error as e:
+                            auto_refresh = False
+                            refresh_note = f"auto-refresh gestopt: {e}"
+                    continue
+            key, steps = _get_nav_key()
+            ch2 = _LAST_CHAR if key == 'OTHER' else None
+            if filter_edit:
+                # typing edits the filter; arrows still move the selection
+                if key in ('ENTER', 'ESC'):
+                    filter_edit = False
+                    if key == 'ESC':
+                        filter_text = ''
+                        apply_view()
+                    selection = scroll_offset = 0
+                    continue
+                if ch2 in ('\x7f', '\b'):
+                    filter_text = filter_text[:-1]
+                    apply_view()
+                    selection = scroll_offset = 0
+                    continue
+                if ch2 and ch2.isprintable():
+                    filter_text += ch2
+                    apply_view(refine=True)
+                    selection = scroll_offset = 0
+                    continue
+            elif ch2 == '/':
+                filter_edit = True
+                continue
+            elif ch2 in ('r', 'R'):
+                if ts_idx is None:
+                    refresh_note = "auto-refresh niet mogelijk (geen changetimestamp)"
+                    continue
+                auto_refresh = not auto_refresh
+                refresh_note = ''
+                if auto_refresh:
+                    refresh_due = time.monotonic() + AUTO_REFRESH_SECONDS
+                    try:
+                        start_auto_refresh()
+                    except mysql.connector.Error as e:
+                        auto_refresh = False
+                        refresh_note = f"auto-refresh gestopt: {e}"
+                continue
+            elif ch2 in ('s', 'S'):
+                labels = [str(c) for c in cols] + ['Sortering wissen', 'Back']
+                choice = show_menu("Sorteer op kolom (zelfde kolom opnieuw: richting omdraaien)", labels)
+                renderer.invalidate()
+                if choice is None or choice < 0:
+                    # Ctrl-C in the column menu
+                    continue
+                if choice < len(cols):
+                    if sort_keys and sort_keys[0][0] == choice:
+                        sort_keys[0] = (choice, not sort_keys[0][1])
+                    else:
+                        # the chosen column becomes the primary key, earlier keys break ties
+                        sort_keys = [(choice, False)] + [k for k in sort_keys if k[0] != choice][:2]
+                elif choice == len(cols):
+                    sort_keys = []
+                else:
+                    continue
+                apply_view()
+                selection = scroll_offset = 0
+                continue
+            if view is None and key in ('DOWN', 'PAGEDOWN') and not pager.done:
+                # moving past the loaded rows: wait for the page that holds the target row
+                step = steps if key == 'DOWN' else list_height * steps
+                if selection + step >= len(rows):
+                    pager.wait_for(selection + step + 1)
+                    # `shown` is the range from before the wait: count the rows that arrived
+                    shown = range(len(rows))
+                    total = len(rows) + 1
             if key == 'UP':
-                selection = (selection - 1) % total
+                selection = (selection - steps) % total
             elif key == 'DOWN':
-                selection = (selection + 1) % total
+                selection = (selection + steps) % total
             elif key == 'PAGEUP':
-                # Move up by one page
-                selection = max(0, selection - list_height)
-                scroll_offset = max(0, scroll_offset - list_height)
+                # Move up by one page (or one per merged key repeat)
+                selection = max(0, selection - list_height * steps)
+                scroll_offset = max(0, scroll_offset - list_height * steps)
                 # ensure selection stays within range
                 selection = min(selection, total - 1)
                 continue
             elif key == 'PAGEDOWN':
                 # Move down by one page
-                selection = min(total - 1, selection + list_height)
+                selection = min(total - 1, selection + list_height * steps)
                 # advance scroll_offset but don't exceed maximal offset
                 max_offset = max(0, total - list_height)
-                scroll_offset = min(max_offset, scroll_offset + list_height)
+                scroll_offset = min(max_offset, scroll_offset + list_height * steps)
                 continue
             elif key == 'ENTER':
-                sel = display_rows[selection]
+                sel = rows[shown[selection]] if selection < len(shown) else None
                 if sel is None:
                     # Back selected
                     break
@@ -750,36 +1571,44 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
                 # build a simple actions menu
                 actions = ['Details', 'Remove', 'Change association (move devices)', 'Back']
                 act = show_menu(f"Acties voor bridge {sel_row[0]}", actions)
+                # the actions menu and prompts drew over the table
+                renderer.invalidate()
                 if act == 0:
-                    clear()
+                    _clear_screen()
                     print('Details:')
-                    for name, val in zip(cols, sel_row):
-                        print(f"{name}: {fmt_val(val)}")
-                    input('Press Enter to continue...')
+                    for j, name in enumerate(cols):
+                        print(f"{name}: {fmt_cell(sel_row, j)}")
+                    _print_bridge_details(conn, cur, database, sel_row[0], host=host)
+                    _prompt('Press Enter to continue...')
                 elif act == 1:
-                    confirm = input(f"Verwijder bridge {sel_row[0]}? Type 'yes' to confirm: ")
+                    confirm = _prompt(f"Verwijder bridge {sel_row[0]}? Type 'yes' to confirm: ")
                     if confirm.lower() == 'yes':
                         ok = remove_bridge(database, int(sel_row[0]), host=host)
+                        _DETAILS_CACHE.invalidate((host, database, sel_row[0]))
                         if ok:
                             print('Removed.')
-                            # refresh rows
-                            rows, cols = load_rows()
-                            col_widths = compute_col_widths(rows)
-                            selection = min(selection, max(0, len(rows)-1))
+                            # drop it locally instead of reloading the table
+                            drop_rows(drop_ids={sel_row[0]})
                             time.sleep(0.5)
                         else:
                             print('Remove failed.')
                             time.sleep(1)
                 elif act == 2:
-                    target = input('New inbridgeid to move devices to: ').strip()
+                    target = _prompt('New inbridgeid to move devices to: ').strip()
                     try:
-                        if change_bridge_association(database, int(sel_row[0]), int(target), host=host):
+                        # device counts of both bridges change
+                        _DETAILS_CACHE.invalidate((host, database, sel_row[0]))
+                        _DETAILS_CACHE.invalidate((host, database, int(target)))
+                        # it asks about a Toolkit restart (input, maybe a subprocess): needs a normal terminal
+                        with _KEYS.suspended():
+                            changed = change_bridge_association(database, int(sel_row[0]), int(target), host=host)
+                        if changed:
                             print('Association changed.')
                         else:
                             print('Association change failed.')
                     except ValueError:
                         print('Invalid id')
-                    input('Press Enter to continue...')
+                    _prompt('Press Enter to continue...')
                 else:
                     # Back from actions - return to table
                     continue
@@ -798,6 +1627,14 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
     except mysql.connector.Error as e:
         print(f"Query error: {e}")
     finally:
+        try:
+            pager.close()
+        except Exception:
+            pass
+        try:
+            health.close()
+        except Exception:
+            pass
         try:
             cur.close()
         except Exception:
@@ -806,10 +1643,14 @@ def list_bridges_for_db(database: str, host: Optional[str] = None) -> None:
             conn.close()
         except Exception:
             pass
-def choose_database(databases: List[str]) -> Optional[str]:
+@_raw_keys
+def choose_database(databases: List[str], index: Optional[DatabaseIndex] = None,
+                    live: Optional[_DatabaseList] = None) -> Optional[str]:
     """Interactive chooser with incremental search: type to narrow the list.
 
-    - type characters to filter (case-insensitive substring)
+    - type characters to filter (prefix, substring and fuzzy matches, best first;
+      see db_search). Pass a prebuilt `index` to avoid rebuilding it per call,
+      or a `live` list whose background updates replace the shown list.
     - Backspace deletes
     - Up/Down move selection
     - Enter selects
@@ -828,24 +1669,24 @@ def choose_database(databases: List[str]) -> Optional[str]:
         window_width = 80
     list_height = max(5, window_height - 7)
 
-    query = ""
+    if live is not None:
+        databases, index = live.names, live.index
+    search = DatabaseSearch(index or DatabaseIndex(databases))
+    seen_version = live.version if live is not None else None
     selection = 0
     scroll_offset = 0
-
-    def clear():
-        if os.name == 'nt':
-            os.system('cls')
-        else:
-            os.system('clear')
-
-    def filtered_items():
-        if not query:
-            return databases
-        q = query.lower()
-        return [d for d in databases if q in d.lower()]
+    renderer = _FrameRenderer()
 
     while True:
-        items = filtered_items()
+        if live is not None and live.version != seen_version:
+            # list revalidated in the background: rerun the current query on the new index
+            seen_version = live.version
+            typed = search.query
+            search = DatabaseSearch(live.index)
+            for ch in typed:
+                search.type(ch)
+        items = search.results
+        query = search.query
         # Always show a final 'Back' option so user can explicitly go back
         display_items = items + ['<Back>']
         if selection >= len(items):
@@ -857,10 +1698,11 @@ def choose_database(databases: List[str]) -> Optional[str]:
         elif selection >= scroll_offset + list_height:
             scroll_offset = selection - list_height + 1
 
-        clear()
-        print(f"\033[36mChoose database{(' - filter: ' + query) if query else ''}\033[0m")
-        print("Type to filter, arrows to navigate, Enter to select, Esc to cancel")
-        print("-" * min(window_width, 200))
+        lines = [
+            f"\033[36mChoose database{(' - filter: ' + query) if query else ''}\033[0m",
+            "Type to filter, arrows to navigate, Enter to select, Esc to cancel",
+            "-" * min(window_width, 200),
+        ]
 
         for i in range(list_height):
             idx = scroll_offset + i
@@ -873,46 +1715,36 @@ def choose_database(databases: List[str]) -> Optional[str]:
                 text = f"{prefix}{display_items[idx]}"
                 if len(text) > window_width:
                     text = text[:window_width-1]
-                print(color + text.ljust(window_width) + '\033[0m')
+                lines.append(color + text.ljust(window_width - 1) + '\033[0m')
             else:
-                print('')
+                lines.append('')
+        renderer.render(lines)
 
-        # read a key directly
+        if live is not None and live.version == seen_version and live.revalidating:
+            # redraw for a list revalidated in the background, not only after the next key
+            if not _key_ready(LIST_POLL_SECONDS):
+                continue
+        if live is not None and live.version != seen_version:
+            continue
+
+        # read a key; repeated arrows that are already queued move in one step
         try:
-            ch = _getch()
+            key, count = _get_nav_key()
         except KeyboardInterrupt:
             return None
+        ch = _LAST_CHAR if key == 'OTHER' else None
 
-        # Handle arrow sequences and special keys
-        if ch in ('\x00', '\xe0') and os.name == 'nt':
-            c2 = _getch()
-            if c2 in ('H', '\x48'):
-                # up
-                selection = (selection - 1) % max(1, len(display_items))
-            elif c2 in ('P', '\x50'):
-                selection = (selection + 1) % max(1, len(display_items))
+        if key == 'UP':
+            selection = (selection - count) % max(1, len(display_items))
             continue
-
-        if ch == '\x1b':
-            # possible escape or arrow on unix
-            # try to read two more chars for arrow sequences
-            try:
-                c2 = _getch()
-                if c2 == '[':
-                    c3 = _getch()
-                    if c3 == 'A':
-                        selection = (selection - 1) % max(1, len(display_items))
-                        continue
-                    if c3 == 'B':
-                        selection = (selection + 1) % max(1, len(display_items))
-                        continue
-                # if we got here it's a plain ESC -> cancel
-                return None
-            except Exception:
-                return None
+        if key == 'DOWN':
+            selection = (selection + count) % max(1, len(display_items))
+            continue
+        if key == 'ESC':
+            return None
 
         # Enter
-        if ch in ('\r', '\n'):
+        if key == 'ENTER':
             # if user selected the Back item, return None
             if selection == len(items):
                 return None
@@ -923,18 +1755,14 @@ def choose_database(databases: List[str]) -> Optional[str]:
 
         # Backspace
         if ch in ('\x7f', '\b', '\x08'):
-            if query:
-                query = query[:-1]
+            if search.query:
+                search.backspace()
                 selection = 0
             continue
 
-        # Ctrl-C
-        if ch == '\x03':
-            return None
-
         # Printable characters: append to query
-        if ord(ch) >= 32:
-            query += ch
+        if ch and ord(ch) >= 32:
+            search.type(ch)
             selection = 0
             continue
 
@@ -1289,8 +2117,75 @@ def manage_database_menu(database: str):
         return
 
 
+def _run_scan_in_background(label: str, cmd: List[str]):
+    """Run a list_bridges_prompt scan and return once its analysis is done.
+
+    The analysis output is shown live; after the child prints the
+    analysis-done marker it keeps writing its exports in the background and
+    its `[export]` lines go to the menu status instead of the screen.
+    """
+    from exporters import ANALYSIS_DONE_MARKER
+
+    env = dict(os.environ, DBSCRIPT_NONINTERACTIVE='1', PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+    # credentials entered in this menu; the child cannot prompt (stdin is not a TTY)
+    if DB_USER:
+        env['DB_USER'] = DB_USER
+    if DB_PASSWORD:
+        env['DB_PASSWORD'] = DB_PASSWORD
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, encoding='utf-8', errors='replace', env=env)
+    analysis_done = threading.Event()
+
+    def _reader():
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            if line == ANALYSIS_DONE_MARKER:
+                analysis_done.set()
+            elif not analysis_done.is_set():
+                print(line)
+            elif line.startswith('[export]'):
+                _SCAN_STATUS.append(f"{label}: {line}")
+        proc.wait()
+        analysis_done.set()
+        _SCAN_STATUS.append(f"{label}: klaar" if proc.returncode == 0 else f"{label}: gestopt met code {proc.returncode}")
+
+    t = threading.Thread(target=_reader, name=f"scan-{label}", daemon=True)
+    t.start()
+    _SCAN_CHILDREN.append((label, proc, t))
+    try:
+        while not analysis_done.wait(0.2):
+            pass
+    except KeyboardInterrupt:
+        # Ctrl-C reaches the child too; it writes its partial results before exiting
+        print(f"{label} afgebroken; gedeeltelijke resultaten worden weggeschreven...")
+        try:
+            proc.wait()
+        except KeyboardInterrupt:
+            proc.terminate()
+
+
+def _wait_for_scans():
+    """Let background scans finish their exports before the menu exits."""
+    for label, proc, t in _SCAN_CHILDREN:
+        if proc.poll() is None:
+            print(f"Wachten tot {label} klaar is met exporteren...")
+        try:
+            proc.wait()
+        except KeyboardInterrupt:
+            proc.terminate()
+        t.join(timeout=5)
+    for line in _SCAN_STATUS:
+        print(line)
+
+
 def main_menu():
-    databases = fetch_databases()
+    # cached list first; the servers are only asked again when it is older than the TTL
+    db_list = _DatabaseList()
+    if not db_list.names:
+        db_list.fetch()
+    elif db_list.stale:
+        db_list.revalidate_async()
+    databases = db_list.names
     if not databases:
         print("No databases available.")
         return
@@ -1298,6 +2193,7 @@ def main_menu():
         "Select a database and manage bridges",
         "Bridge health scan (alle bridges, export ca. 10 min)",
         "Poll fails scan (>15% fails, export)",
+        "Fleet sweep (health + poll fails + open/recent in één run)",
         "Exit"
     ]
     # Detect venv python.exe
@@ -1308,7 +2204,7 @@ def main_menu():
         while True:
             choice = show_menu("=== DB Menu ===", options)
             if choice == 0:
-                db = choose_database(databases)
+                db = choose_database(databases, live=db_list)
                 if not db:
                     continue
                 manage_database_menu(db)
@@ -1316,7 +2212,7 @@ def main_menu():
                 # Bridge health scan
                 print("Bridge health scan wordt gestart...")
                 try:
-                    subprocess.call([venv_python, os.path.join(os.path.dirname(__file__), "list_bridges_prompt.py"), "--action", "all", "--export", "./bridge_scan_menu_output", "--gap-minutes", "20", "--window-days", "4", "--restart-window-threshold", "20"])
+                    _run_scan_in_background("Bridge health scan", [venv_python, os.path.join(os.path.dirname(__file__), "list_bridges_prompt.py"), "--action", "all", "--export", "./bridge_scan_menu_output", "--gap-minutes", "20", "--window-days", "4", "--restart-window-threshold", "20", "--export-format", "xlsx"])
                 except Exception as e:
                     print(f"Fout bij uitvoeren bridge health scan: {e}")
                 try:
@@ -1327,14 +2223,25 @@ def main_menu():
                 # Poll fails scan
                 print("Poll fails scan wordt gestart...")
                 try:
-                    subprocess.call([venv_python, os.path.join(os.path.dirname(__file__), "list_bridges_prompt.py"), "--action", "pollall", "--export", "./pollfail_menu_output", "--poll-threshold", "15"])
+                    _run_scan_in_background("Poll fails scan", [venv_python, os.path.join(os.path.dirname(__file__), "list_bridges_prompt.py"), "--action", "pollall", "--export", "./pollfail_menu_output", "--poll-threshold", "15", "--export-format", "xlsx"])
                 except Exception as e:
                     print(f"Fout bij uitvoeren poll fails scan: {e}")
                 try:
                     input("Druk op Enter om terug te keren naar het menu...")
                 except KeyboardInterrupt:
                     return
-            elif choice == 3 or choice is None or choice < 0:
+            elif choice == 3:
+                # Fused sweep: one pass over all databases, one workbook
+                print("Fleet sweep wordt gestart...")
+                try:
+                    _run_scan_in_background("Fleet sweep", [venv_python, os.path.join(os.path.dirname(__file__), "list_bridges_prompt.py"), "--action", "sweep", "--export", "./fleet_sweep_menu_output", "--gap-minutes", "20", "--window-days", "4", "--restart-window-threshold", "20", "--poll-threshold", "15", "--export-format", "xlsx"])
+                except Exception as e:
+                    print(f"Fout bij uitvoeren fleet sweep: {e}")
+                try:
+                    input("Druk op Enter om terug te keren naar het menu...")
+                except KeyboardInterrupt:
+                    return
+            elif choice == 4 or choice is None or choice < 0:
                 break
             else:
                 print("Invalid choice")
@@ -1346,6 +2253,8 @@ def main_menu():
         # Ctrl-C at top level -> exit
         print()
         return
+    finally:
+        _wait_for_scans()
 
 if __name__ == '__main__':
     main_menu()
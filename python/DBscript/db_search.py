@@ -0,0 +1,156 @@
+"""Search index for the `host/schema` list of the database chooser.
+
+Built once when the list loads: lowercased names, their tokens and a trigram
+index. Matches are ranked in tiers (exact schema, schema prefix, token prefix,
+substring, in-order characters, trigram similarity). Strict matches only get
+fewer as the query grows, so each keystroke filters the previous result set;
+`DatabaseSearch` keeps a stack of those sets so Backspace just pops one.
+
+Kept free of import side effects so db_menu can import it.
+"""
+from __future__ import annotations
+from collections import Counter
+import re
+
+
+# trigram matches (typos) are looked up when fewer strict matches than this remain
+FUZZY_MIN_STRICT = 5
+# share of the query's trigrams a name must contain to count as a fuzzy match
+FUZZY_MIN_OVERLAP = 0.5
+FUZZY_MIN_QUERY = 4
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _is_subsequence(term: str, text: str) -> int | None:
+    """Span length of the first in-order occurrence of `term`'s characters in `text`, or None."""
+    start = pos = -1
+    for ch in term:
+        pos = text.find(ch, pos + 1)
+        if pos < 0:
+            return None
+        if start < 0:
+            start = pos
+    return pos - start + 1
+
+
+class DatabaseIndex:
+    """Lowercased names, tokens and trigram postings of a list of `host/schema` names."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._lower = [n.lower() for n in self.names]
+        # the schema part is what users type; the host part still matches, lower ranked
+        self._schema = [n.rsplit('/', 1)[-1] for n in self._lower]
+        self._tokens = [_TOKEN_RE.findall(n) for n in self._schema]
+        self._host_tokens = [_TOKEN_RE.findall(n[:len(n) - len(s)]) for n, s in zip(self._lower, self._schema)]
+        self._postings: dict = {}
+        for i, n in enumerate(self._lower):
+            for gram in _trigrams(n):
+                self._postings.setdefault(gram, set()).add(i)
+
+    def _term_rank(self, i: int, term: str):
+        """(tier, detail) of `term` for item `i` (lower is better), or None when it does not match."""
+        schema = self._schema[i]
+        if schema == term:
+            return 0, 0
+        if schema.startswith(term):
+            return 1, len(schema)
+        for pos, tok in enumerate(self._tokens[i]):
+            if tok.startswith(term):
+                return 2, pos
+        if any(tok.startswith(term) for tok in self._host_tokens[i]):
+            return 3, 0
+        pos = self._lower[i].find(term)
+        if pos >= 0:
+            return 3, 1 + pos
+        span = _is_subsequence(term, self._lower[i])
+        if span is not None:
+            return 4, span
+        return None
+
+    def rank(self, i: int, terms) -> tuple | None:
+        """Sort key of item `i` for all `terms` (every term must match), or None."""
+        tiers = []
+        details = 0
+        for term in terms:
+            r = self._term_rank(i, term)
+            if r is None:
+                return None
+            tiers.append(r[0])
+            details += r[1]
+        return max(tiers), sum(tiers), details, len(self._lower[i]), i
+
+    def strict_matches(self, terms, within=None) -> list:
+        """Indices of items matching all `terms` (tiers 0-4) in rank order, searched in `within` or the whole list."""
+        candidates = range(len(self.names)) if within is None else within
+        keyed = []
+        for i in candidates:
+            key = self.rank(i, terms)
+            if key is not None:
+                keyed.append(key)
+        keyed.sort()
+        return [key[-1] for key in keyed]
+
+    def fuzzy_matches(self, query: str, exclude=()) -> list:
+        """Indices sharing at least FUZZY_MIN_OVERLAP of `query`'s trigrams, via the postings (no scan)."""
+        grams = _trigrams(query.replace(' ', ''))
+        if len(query) < FUZZY_MIN_QUERY or not grams:
+            return []
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        need = max(1, int(len(grams) * FUZZY_MIN_OVERLAP + 0.5))
+        skip = set(exclude)
+        return [i for i, c in counts.items() if c >= need and i not in skip]
+
+    def ordered(self, strict, fuzzy=(), query: str = '') -> list:
+        """Names of the ranked `strict` indices, followed by `fuzzy` ranked by trigram overlap."""
+        order = list(strict)
+        if fuzzy:
+            grams = _trigrams(query.replace(' ', ''))
+            order += sorted(fuzzy, key=lambda i: (-len(grams & _trigrams(self._lower[i])), len(self._lower[i]), i))
+        return [self.names[i] for i in order]
+
+
+class DatabaseSearch:
+    """Incremental query state over a `DatabaseIndex`.
+
+    `type(ch)` narrows the previous strict result set, `backspace()` restores
+    the set that was current before the last character.
+    """
+
+    def __init__(self, index: DatabaseIndex):
+        self.index = index
+        self.query = ''
+        # (query, strict indices, ranked names) per typed character; bottom entry is the empty query
+        self._stack = [('', list(range(len(index.names))), list(index.names))]
+
+    @property
+    def results(self) -> list:
+        return self._stack[-1][2]
+
+    def type(self, ch: str) -> list:
+        prev_query, prev_strict, _ = self._stack[-1]
+        query = prev_query + ch.lower()
+        terms = query.split()
+        if not terms:
+            strict, ranked = prev_strict, self._stack[-1][2]
+        else:
+            # a longer query never matches more strictly, so only the previous matches are checked
+            strict = prev_strict if ch.isspace() else self.index.strict_matches(terms, prev_strict)
+            fuzzy = self.index.fuzzy_matches(query, strict) if len(strict) < FUZZY_MIN_STRICT else []
+            ranked = self.index.ordered(strict, fuzzy, query)
+        self._stack.append((query, strict, ranked))
+        self.query = query
+        return ranked
+
+    def backspace(self) -> list:
+        if len(self._stack) > 1:
+            self._stack.pop()
+        self.query = self._stack[-1][0]
+        return self.results
@@ -0,0 +1,524 @@
+"""Export writers shared by the DB scripts.
+
+XLSX files are streamed with openpyxl's write-only mode: rows go to disk as
+they are appended, and header bold, freeze panes and autofilter/table are set
+on the sheet itself instead of by walking every cell afterwards. Memory stays
+flat and large combined reports no longer spend most of their time styling.
+
+`EXPORT_BACKENDS` registers the single-table formats (xlsx, json, parquet,
+ndjson, csv.gz, csv.zst); the streaming ones write in chunks of
+`EXPORT_CHUNK_ROWS`. Parquet needs pyarrow and csv.zst needs zstandard; both
+are optional and their formats are only offered when installed.
+
+All writers share `write_with_fallback`: a locked target file (open in Excel)
+is retried interactively, or replaced by a timestamped fallback file when the
+script runs non-interactively (`DBSCRIPT_NONINTERACTIVE=1`, no TTY) or from
+the background `ExportWorker`, which never prompts.
+"""
+from __future__ import annotations
+from datetime import datetime
+from pathlib import Path
+import atexit
+import gzip
+import io
+import os
+import queue
+import re
+import sys
+import threading
+import warnings
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: parquet export
+    pa = pq = None
+try:
+    import zstandard
+except ImportError:  # optional: csv.zst export
+    zstandard = None
+
+
+# rows converted to python objects per step; bounds the temporary object copy
+XLSX_CHUNK_ROWS = 10000
+XLSX_MAX_SHEET_NAME = 31
+# rows per chunk for the streaming formats (ndjson, parquet row groups, compressed csv)
+EXPORT_CHUNK_ROWS = 50000
+DEFAULT_EXPORT_FORMAT = 'xlsx'
+
+
+def is_locked_error(e: Exception) -> bool:
+    """True for PermissionError / errno 13, i.e. the target is open in another program."""
+    return isinstance(e, PermissionError) or getattr(e, 'errno', None) == 13
+
+
+# set in the ExportWorker thread: background writes must never wait for input()
+_thread_state = threading.local()
+
+# printed by a scan once its analysis is done; db_menu returns to the menu on this line
+ANALYSIS_DONE_MARKER = '[analysis-done] Analyse klaar; exports lopen op de achtergrond.'
+
+
+def is_noninteractive() -> bool:
+    if getattr(_thread_state, 'background', False):
+        return True
+    return sys.stdin is None or not sys.stdin.isatty() or os.getenv('DBSCRIPT_NONINTERACTIVE') == '1'
+
+
+def fallback_path(path: Path) -> Path:
+    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # keep compound suffixes such as .csv.gz together
+    suffix = ''.join(path.suffixes[-2:]) if path.suffixes[-2:-1] == ['.csv'] else path.suffix
+    return path.with_name(f"{path.name[:len(path.name) - len(suffix)]}_{ts}{suffix}")
+
+
+def write_with_fallback(path: Path | str, write, label: str = 'file') -> Path:
+    """Call `write(target)` for `path`; on a locked file retry or write a timestamped fallback.
+
+    Interactively the user can close the file and retry up to 3 times (or type
+    's' to skip); non-interactively the fallback is written immediately.
+    Returns the Path actually written. Raises the original exception otherwise.
+    """
+    path = Path(path)
+    try:
+        write(path)
+        return path
+    except Exception as e:
+        if not is_locked_error(e):
+            raise
+
+    def _write_alt():
+        alt = fallback_path(path)
+        write(alt)
+        print(f'Primary {label} {path} locked; wrote fallback {label}: {alt}')
+        return alt
+
+    if is_noninteractive():
+        return _write_alt()
+
+    attempts = 0
+    while attempts < 3:
+        ans = input(f"File {path} appears locked. Close it and press Enter to retry, or type 's' to skip and write a timestamped fallback: ").strip().lower()
+        if ans == 's':
+            return _write_alt()
+        attempts += 1
+        try:
+            write(path)
+            return path
+        except Exception as inner_e:
+            if not is_locked_error(inner_e):
+                raise
+            print(f"Still locked (attempt {attempts}).")
+
+    # attempts exhausted — write fallback
+    return _write_alt()
+
+
+def open_with_fallback(path: Path | str, label: str = 'file', **open_kwargs):
+    """Open `path` for writing with the shared locked-file fallback; returns (Path, file object).
+
+    For writers that stream into the file over a longer run instead of writing it in one call.
+    """
+    handles = []
+    written = write_with_fallback(path, lambda target: handles.append(open(target, 'w', **open_kwargs)), label=label)
+    return written, handles[0]
+
+
+def _sheet_title(name: str) -> str:
+    return re.sub(r"[\[\]\:\*\?/\\]", "_", str(name))[:XLSX_MAX_SHEET_NAME] or 'Sheet1'
+
+
+def _table_name(name: str) -> str:
+    # Excel table names: letters, digits and underscores, not starting with a digit
+    cleaned = re.sub(r'\W', '_', str(name))
+    return cleaned if cleaned and not cleaned[0].isdigit() else f"T_{cleaned}"
+
+
+def _iter_rows(df: pd.DataFrame, chunk_rows: int = XLSX_CHUNK_ROWS):
+    """Yield rows as tuples with NaN/NaT as None and timezone info dropped (openpyxl rejects tz-aware values)."""
+    for start in range(0, len(df), chunk_rows):
+        block = df.iloc[start:start + chunk_rows]
+        for col in block.columns:
+            if isinstance(block[col].dtype, pd.DatetimeTZDtype):
+                block = block.assign(**{col: block[col].dt.tz_localize(None)})
+        block = block.astype(object)
+        block = block.where(block.notna(), None)
+        yield from block.itertuples(index=False, name=None)
+
+
+# above this many rows string widths are estimated from a sample
+WIDTH_SAMPLE_THRESHOLD = 20000
+WIDTH_SAMPLE_ROWS = 5000
+DATETIME_WIDTH = 19  # 'YYYY-MM-DD HH:MM:SS'
+# column width cap of the xlsx writers (partitioned scans and list_bridges_prompt sheets)
+XLSX_MAX_COLUMN_WIDTH = 60
+
+
+def _value_width(s: pd.Series, sample_threshold: int, sample_rows: int) -> int:
+    """Widest rendered value of `s`: from the dtype for numbers/dates, measured for text."""
+    s = s.dropna()
+    if s.empty:
+        return 0
+    if pd.api.types.is_bool_dtype(s):
+        return 5
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return DATETIME_WIDTH
+    if pd.api.types.is_integer_dtype(s):
+        return max(len(str(int(s.max()))), len(str(int(s.min()))))
+    if pd.api.types.is_float_dtype(s):
+        # integer digits + sign + decimal point + a few decimals
+        biggest = float(max(abs(s.max()), abs(s.min())))
+        return (len(str(int(biggest))) if biggest < 1e15 else 15) + 5
+    if len(s) > sample_threshold:
+        # the longest values are usually long everywhere; a fixed-seed sample keeps widths stable between runs
+        s = s.sample(n=sample_rows, random_state=0)
+    try:
+        lens = s.str.len()
+    except AttributeError:
+        # .str refuses columns without any strings (e.g. all Decimals)
+        lens = pd.Series(float('nan'), index=s.index)
+    missing = lens.isna()
+    if missing.any():
+        # non-string objects (numbers, timestamps, Decimals) in object columns
+        lens = lens.where(~missing, s[missing].astype(str).str.len())
+    return int(lens.max())
+
+
+def estimate_column_widths(df: pd.DataFrame, max_width: int = 50, padding: int = 0,
+                           sample_threshold: int = WIDTH_SAMPLE_THRESHOLD, sample_rows: int = WIDTH_SAMPLE_ROWS) -> list:
+    """Excel column widths for `df`: max(header, widest value) + `padding`, capped at `max_width`.
+
+    Text columns use vectorized `.str.len()` (sampled above `sample_threshold`
+    rows); numeric and datetime widths come from the dtype and min/max, so no
+    cell is converted to a Python string one by one.
+    """
+    widths = []
+    for i, col in enumerate(df.columns):
+        value_width = _value_width(df.iloc[:, i], sample_threshold, sample_rows)
+        widths.append(min(max(value_width, len(str(col))) + padding, max_width))
+    return widths
+
+
+def unique_title(name: str, used: set) -> str:
+    """Valid sheet title for `name` that is not in `used` yet (and add it there)."""
+    title = _sheet_title(name)
+    while title in used:
+        title = _sheet_title(f"{title[:28]}_{len(used)}")
+    used.add(title)
+    return title
+
+
+def append_sheet(wb, title: str, columns, frames, widths=None, table_style: str | None = None, header_font=None):
+    """Stream `frames` (DataFrames, reindexed to `columns`) into a new write-only sheet `title`."""
+    ws = wb.create_sheet(title=title)
+    for i, width in enumerate(widths or [], 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    # sheetViews precede the row data in the XML, so panes are set before the first row
+    ws.freeze_panes = 'A2'
+
+    header = []
+    for col in columns:
+        cell = WriteOnlyCell(ws, value=str(col))
+        cell.font = header_font or Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+    nrows = 0
+    for df in frames:
+        if list(df.columns) != list(columns):
+            df = df.reindex(columns=columns)
+        for row in _iter_rows(df):
+            ws.append(row)
+        nrows += len(df)
+
+    # filter/table refs are written after the row data, so they can follow the rows
+    ref = f"A1:{get_column_letter(max(1, len(columns)))}{nrows + 1}"
+    if table_style and len(columns):
+        table = Table(displayName=_table_name(title), ref=ref)
+        # write-only sheets cannot derive the table columns from the cells
+        table.tableColumns = [TableColumn(id=i, name=str(col)) for i, col in enumerate(columns, 1)]
+        table.autoFilter = AutoFilter(ref=ref)
+        table.tableStyleInfo = TableStyleInfo(name=table_style, showFirstColumn=False, showLastColumn=False, showRowStripes=True, showColumnStripes=True)
+        with warnings.catch_warnings():
+            # openpyxl warns on every write-only add_table; the columns are set above
+            warnings.simplefilter('ignore', UserWarning)
+            ws.add_table(table)
+    else:
+        ws.auto_filter.ref = ref
+    return ws
+
+
+def write_xlsx_stream(path: Path | str, sheets: dict, column_widths: dict | None = None, table_style: str | None = None):
+    """Write a mapping sheet_name -> DataFrame to `path` in openpyxl write-only mode.
+
+    Every sheet gets a bold header row, frozen panes below the header and an
+    autofilter over the data. With `table_style` (e.g. 'TableStyleMedium9') an
+    Excel table is added instead of the plain autofilter. `column_widths` maps
+    sheet_name -> list of widths (one per column).
+    """
+    wb = Workbook(write_only=True)
+    header_font = Font(bold=True)
+    used = set()
+    for name, df in sheets.items():
+        append_sheet(wb, unique_title(name, used), list(df.columns), [df],
+                      widths=(column_widths or {}).get(name), table_style=table_style, header_font=header_font)
+    if not sheets:
+        wb.create_sheet(title='Sheet1')
+    wb.save(str(path))
+
+
+def write_xlsx_sheets_with_fallback(path: Path | str, sheets: dict, column_widths: dict | None = None, table_style: str | None = None) -> Path:
+    """Stream `sheets` to an XLSX workbook with the shared locked-file fallback."""
+    return write_with_fallback(path, lambda target: write_xlsx_stream(target, sheets, column_widths=column_widths, table_style=table_style), label='Excel')
+
+
+def write_csv_with_fallback(path: Path | str, df: pd.DataFrame, sep: str = ';') -> Path:
+    """Write `df` as semicolon CSV (UTF-8 BOM, opens cleanly in Excel) with the shared locked-file fallback."""
+    return write_with_fallback(path, lambda target: df.to_csv(target, index=False, sep=sep, encoding='utf-8-sig'), label='CSV')
+
+
+def _chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+
+def _write_json(df: pd.DataFrame, target: Path, sheet_name: str):
+    df.to_json(target, orient='records', indent=2, force_ascii=False, date_format='iso')
+
+
+def _write_ndjson(df: pd.DataFrame, target: Path, sheet_name: str):
+    with open(target, 'w', encoding='utf-8', newline='\n') as f:
+        for _, chunk in _chunks(df):
+            if chunk.empty:
+                continue
+            text = chunk.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+            f.write(text if text.endswith('\n') else text + '\n')
+
+
+def _write_csv_stream(df: pd.DataFrame, f, sep: str = ';'):
+    for start, chunk in _chunks(df):
+        chunk.to_csv(f, index=False, sep=sep, header=(start == 0))
+
+
+def _write_csv_gz(df: pd.DataFrame, target: Path, sheet_name: str):
+    with gzip.open(target, 'wt', encoding='utf-8-sig', newline='') as f:
+        _write_csv_stream(df, f)
+
+
+def _write_csv_zst(df: pd.DataFrame, target: Path, sheet_name: str):
+    with open(target, 'wb') as raw:
+        with zstandard.ZstdCompressor(level=3).stream_writer(raw) as zw:
+            with io.TextIOWrapper(zw, encoding='utf-8-sig', newline='') as f:
+                _write_csv_stream(df, f)
+
+
+def _write_parquet(df: pd.DataFrame, target: Path, sheet_name: str):
+    # schema from the whole frame, so an all-None first chunk does not fix a column to null
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(str(target), schema, compression='snappy') as writer:
+        for _, chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_xlsx(df: pd.DataFrame, target: Path, sheet_name: str):
+    write_xlsx_stream(target, {sheet_name: df})
+
+
+# name -> (file suffix, writer(df, target, sheet_name), available)
+EXPORT_BACKENDS = {
+    'xlsx': ('.xlsx', _write_xlsx, True),
+    'json': ('.json', _write_json, True),
+    'parquet': ('.parquet', _write_parquet, pa is not None),
+    'ndjson': ('.ndjson', _write_ndjson, True),
+    'csv.gz': ('.csv.gz', _write_csv_gz, True),
+    'csv.zst': ('.csv.zst', _write_csv_zst, zstandard is not None),
+}
+
+
+def available_formats() -> list:
+    """Names of the export formats whose optional dependencies are installed."""
+    return [name for name, (_, _, ok) in EXPORT_BACKENDS.items() if ok]
+
+
+def export_df(df: pd.DataFrame, parent: Path | str, prefix: str, fmt: str, sheet_name: str = 'Logs') -> Path:
+    """Write `df` to `parent/prefix<suffix>` with backend `fmt`; returns the Path actually written."""
+    if fmt not in EXPORT_BACKENDS:
+        raise ValueError(f"Unknown export format: {fmt} (choose from {', '.join(EXPORT_BACKENDS)})")
+    suffix, writer, ok = EXPORT_BACKENDS[fmt]
+    if not ok:
+        raise RuntimeError(f"Export format {fmt} needs an optional package that is not installed")
+    target = Path(parent) / f"{prefix}{suffix}"
+    return write_with_fallback(target, lambda t: writer(df, t, sheet_name), label=fmt)
+
+
+class PartitionedExport:
+    """Per-schema partitions written as soon as each schema is analysed, combined into one workbook at the end.
+
+    `add` writes the schema's frame to `<prefix>_parts/` right away (parquet when
+    pyarrow is installed, csv.gz otherwise), so a scan does not hold every
+    result until the last schema and an interrupted scan keeps what it found.
+    `finalize` streams the partitions into a workbook: a combined sheet (with a
+    `database` column) followed by one sheet per schema.
+    """
+
+    def __init__(self, parent: Path | str, prefix: str, combined_sheet: str = 'Combined'):
+        self.parent = Path(parent)
+        self.prefix = prefix
+        self.combined_sheet = combined_sheet
+        self.parts_dir = self.parent / f"{prefix}_parts"
+        self.parts = []  # (schema, path)
+        # column -> width per schema, measured when the partition is added
+        self.widths = {}
+
+    def add(self, schema: str, df: pd.DataFrame) -> Path | None:
+        """Write the partition for `schema` (empty frames are skipped); returns its path."""
+        if df is None or df.empty:
+            return None
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        stem = re.sub(r'[^\w.-]', '_', str(schema)) or 'schema'
+        df = df.assign(database=schema)
+        df = df[['database'] + [c for c in df.columns if c != 'database']]
+        path = None
+        if pa is not None:
+            path = self.parts_dir / f"{stem}.parquet"
+            try:
+                df.to_parquet(path, index=False)
+            except Exception:
+                # mixed-type object columns cannot be stored as parquet; keep them as csv
+                path = None
+        if path is None:
+            path = self.parts_dir / f"{stem}.csv.gz"
+            df.to_csv(path, index=False, sep=';', encoding='utf-8-sig', compression='gzip')
+        self.parts.append((schema, path))
+        self.widths[schema] = dict(zip(df.columns, estimate_column_widths(df, max_width=XLSX_MAX_COLUMN_WIDTH, padding=2)))
+        return path
+
+    @staticmethod
+    def _read(path: Path) -> pd.DataFrame:
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path)
+        return pd.read_csv(path, sep=';', encoding='utf-8-sig', compression='gzip')
+
+    def frames(self):
+        """Yield (schema, frame) per partition, read back from disk one at a time."""
+        for schema, path in self.parts:
+            yield schema, self._read(path)
+
+    def _columns(self) -> list:
+        columns = []
+        for _, path in self.parts:
+            if path.suffix == '.parquet':
+                names = pq.read_schema(path).names
+            else:
+                names = list(pd.read_csv(path, sep=';', encoding='utf-8-sig', compression='gzip', nrows=0).columns)
+            columns += [c for c in names if c not in columns]
+        return columns
+
+    def _write(self, target: Path):
+        wb = Workbook(write_only=True)
+        header_font = Font(bold=True)
+        used = set()
+        columns = self._columns()
+        combined_widths = [max(w.get(c, 0) for w in self.widths.values()) for c in columns]
+        append_sheet(wb, unique_title(self.combined_sheet, used), columns,
+                      (self._read(path) for _, path in self.parts), widths=combined_widths, header_font=header_font)
+        for schema, path in self.parts:
+            df = self._read(path).drop(columns='database')
+            widths = [self.widths[schema].get(c, 0) for c in df.columns]
+            append_sheet(wb, unique_title(schema, used), list(df.columns), [df], widths=widths, header_font=header_font)
+        wb.save(str(target))
+
+    def finalize(self, keep_parts: bool = False) -> Path | None:
+        """Build the workbook from the partitions (shared locked-file fallback); returns its path or None.
+
+        The partition files are removed afterwards unless `keep_parts` is set
+        or the workbook could not be written.
+        """
+        if not self.parts:
+            return None
+        target = self.parent / f"{self.prefix}.xlsx"
+        written = write_with_fallback(target, self._write, label='Excel')
+        if not keep_parts:
+            for _, path in self.parts:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            try:
+                self.parts_dir.rmdir()
+            except OSError:
+                pass
+        return written
+
+
+class ExportWorker:
+    """Single background thread that writes queued exports in submission order.
+
+    `submit` returns immediately; completion and failures are printed as
+    `[export] ...` lines when each job finishes. Inside the worker every
+    writer is non-interactive, so a locked file gets the timestamped
+    fallback instead of a prompt. `flush` waits for all queued jobs and is
+    registered with atexit, so pending writes finish before the process exits.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='export-worker', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        _thread_state.background = True
+        while True:
+            label, fn, on_done = self._queue.get()
+            try:
+                result = fn()
+                print(f"[export] klaar: {label} -> {result}", flush=True)
+                if on_done is not None:
+                    try:
+                        on_done(result)
+                    except Exception:
+                        pass
+            except Exception as e:
+                print(f"[export] mislukt: {label}: {e}", flush=True)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, label: str, fn, on_done=None):
+        """Queue `fn()` (returns the written Path); `on_done(path)` runs in the worker after success."""
+        self._queue.put((label, fn, on_done))
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        n = self.pending()
+        if n:
+            print(f"[export] wachten op {n} export(s)...", flush=True)
+        self._queue.join()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def export_worker() -> ExportWorker:
+    """Return the process-wide ExportWorker, starting it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ExportWorker()
+        return _worker
+
+
+def flush_exports():
+    """Wait for queued background exports (no-op when the worker never started)."""
+    if _worker is not None:
+        _worker.flush()
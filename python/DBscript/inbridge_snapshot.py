@@ -0,0 +1,76 @@
+"""Fetch the `inbridge` tables of many schemas in a few round trips.
+
+`inbridge` is small, so for inbridge-only reports the per-schema round trip
+(connect, probe, query) dominates. `build_inbridge_union` generates chunked
+`UNION ALL` statements over fully qualified `schema`.`inbridge` tables with
+the schema name as an extra `database` column, so a whole host's inventory
+comes back in a handful of queries.
+"""
+from __future__ import annotations
+
+import pandas as pd
+
+
+UNION_CHUNK_SIZE = 50
+SYSTEM_SCHEMAS = ('mysql', 'information_schema', 'performance_schema', 'sys')
+
+
+def _quote_ident(name: str) -> str:
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def build_inbridge_union(schemas, columns, chunk_size: int = UNION_CHUNK_SIZE):
+    """Return a list of (sql, params) tuples, one `UNION ALL` statement per `chunk_size` schemas."""
+    cols = ', '.join(_quote_ident(c) for c in columns)
+    schemas = list(schemas)
+    statements = []
+    for start in range(0, len(schemas), max(1, int(chunk_size))):
+        chunk = schemas[start:start + max(1, int(chunk_size))]
+        parts = [f"SELECT %s AS `database`, {cols} FROM {_quote_ident(s)}.`inbridge`" for s in chunk]
+        statements.append((' UNION ALL '.join(parts), tuple(chunk)))
+    return statements
+
+
+def inbridge_schemas(conn, include_system: bool = False) -> list:
+    """Sorted schema names that have an `inbridge` table (one information_schema query)."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT DISTINCT table_schema FROM information_schema.tables "
+            "WHERE table_name = 'inbridge' ORDER BY table_schema"
+        )
+        schemas = [r[0] for r in cur.fetchall()]
+    finally:
+        cur.close()
+    return [s for s in schemas if include_system or s not in SYSTEM_SCHEMAS]
+
+
+def read_inbridge_union(conn, schemas, columns, chunk_size: int = UNION_CHUNK_SIZE) -> pd.DataFrame:
+    """Read `columns` of `inbridge` for all `schemas`; returns one DataFrame with a `database` column.
+
+    When a chunk fails (e.g. one schema lacks a column), its schemas are read
+    one by one so a single odd schema does not drop the other 49.
+    """
+    out_cols = ['database'] + list(columns)
+    frames = []
+    cur = conn.cursor()
+    try:
+        for sql, params in build_inbridge_union(schemas, columns, chunk_size):
+            try:
+                cur.execute(sql, params)
+                frames.append(pd.DataFrame(cur.fetchall(), columns=out_cols))
+                continue
+            except Exception as e:
+                print(f"UNION ALL chunk failed ({e}); falling back to per-schema reads for {len(params)} schemas")
+            for schema in params:
+                (single_sql, single_params), = build_inbridge_union([schema], columns)
+                try:
+                    cur.execute(single_sql, single_params)
+                    frames.append(pd.DataFrame(cur.fetchall(), columns=out_cols))
+                except Exception as e:
+                    print(f"Skipping {schema}: {e}")
+    finally:
+        cur.close()
+    if not frames:
+        return pd.DataFrame(columns=out_cols)
+    return pd.concat(frames, ignore_index=True)
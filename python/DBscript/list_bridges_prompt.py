@@ -50,9 +50,15 @@ from datetime import datetime, timedelta
 import pandas as pd
 from pathlib import Path
 import re
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Border, Font
 import sys
+from comlog_rollup import update_rollups, read_rollups, summarize_rollups, prune_rollups
+from bridge_metrics import pollfail_percent
+from poll_snapshots import apply_poll_snapshot
+from inbridge_snapshot import inbridge_schemas, read_inbridge_union
+from exporters import (
+    write_csv_with_fallback, write_xlsx_sheets_with_fallback, export_df, available_formats, is_noninteractive,
+    export_worker, flush_exports, estimate_column_widths, XLSX_MAX_COLUMN_WIDTH, PartitionedExport, EXPORT_BACKENDS, DEFAULT_EXPORT_FORMAT, ANALYSIS_DONE_MARKER,
+)
 
 
 # ANSI colors
@@ -80,183 +86,117 @@ def _prepare_output(export_path: str | Path):
     return parent, prefix
 
 
-def _apply_excel_sheet_styles(writer, sheet_name: str, df: pd.DataFrame):
-    """Apply simple styles: add autofilter over header row, freeze header, and remove cell borders.
+def _write_csv_with_fallback(path: Path, df: pd.DataFrame, sep: str = ';'):
+    """Write `df` to `path`; on a locked file retry or write a timestamped filename.
 
-    `writer` is a pandas ExcelWriter using openpyxl engine.
+    Returns the Path actually written or raises the original exception if both attempts fail.
     """
-    try:
-        wb = writer.book
-        # writer.sheets populated after to_excel call
-        ws = writer.sheets.get(sheet_name) or wb[sheet_name]
-        # number of rows written (exclude header) — ensure at least header row
-        nrows = max(0, len(df))
-        ncols = max(1, len(df.columns))
-        last_col = get_column_letter(ncols)
-        # set autofilter across header row (A1:lastcol{nrows+1})
-        ws.auto_filter.ref = f"A1:{last_col}{nrows+1}"
-        # freeze header row
-        ws.freeze_panes = ws['A2']
-        # make header row bold
-        try:
-            header_font = Font(bold=True)
-            for cell in ws[1]:
-                cell.font = header_font
-        except Exception:
-            pass
-        # remove borders from all cells in the used range (header + data)
-        empty_border = Border()
-        for row in ws.iter_rows(min_row=1, max_row=nrows+1, min_col=1, max_col=ncols):
-            for cell in row:
-                cell.border = empty_border
-    except Exception:
-        # non-fatal styling; ignore on failure
-        pass
+    return write_csv_with_fallback(path, df, sep=sep)
 
 
-def _write_csv_with_fallback(path: Path, df: pd.DataFrame, sep: str = ';'):
-    """Write `df` to `path`; on PermissionError retry with a timestamped filename.
+def _write_xlsx_sheets_with_fallback(path: Path, sheets: dict) -> Path:
+    """Stream a mapping sheet_name -> DataFrame to `path` as one styled XLSX workbook with fitted column widths.
 
-    Returns the Path actually written or raises the original exception if both attempts fail.
+    On a locked file, retry or write a timestamped filename and return the
+    Path actually written (see exporters.write_with_fallback).
     """
-    try:
-        df.to_csv(path, index=False, sep=sep, encoding='utf-8-sig')
-        return path
-    except Exception as e:
-        # check for permission-like errors (PermissionError or errno 13)
-        is_perm = isinstance(e, PermissionError) or getattr(e, 'errno', None) == 13
-        if not is_perm:
-            raise
-        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-        alt = path.with_name(f"{path.stem}_{ts}{path.suffix}")
-        try:
-            df.to_csv(alt, index=False, sep=sep, encoding='utf-8-sig')
-            print(f'Primary CSV {path} locked; wrote fallback CSV: {alt}')
-            return alt
-        except Exception:
-            # re-raise original for caller to report
-            raise
+    widths = {name: estimate_column_widths(df, max_width=XLSX_MAX_COLUMN_WIDTH, padding=2) for name, df in sheets.items()}
+    return write_xlsx_sheets_with_fallback(path, sheets, column_widths=widths)
 
 
 def _write_xlsx_with_fallback(path: Path, df: pd.DataFrame, sheet_name: str = 'Sheet1') -> Path:
-    """Write `df` to `path` as an XLSX workbook, applying styles.
+    """Write `df` to `path` as a single-sheet XLSX workbook (see _write_xlsx_sheets_with_fallback)."""
+    return _write_xlsx_sheets_with_fallback(path, {sheet_name: df})
 
-    On PermissionError (file locked), retry with a timestamped filename and
-    return the Path actually written. Raises original exception if both fail.
+
+# Set from --export-format; when set, _export_df_prompt writes this format without asking
+EXPORT_FORMAT: str | None = None
+
+
+def _choose_export_formats(exclude=()) -> list:
+    """Return the export format names to write: the CLI choice, or the user's pick from the registry.
+
+    Formats in `exclude` are written elsewhere by the caller and are not offered.
     """
-    try:
-        with pd.ExcelWriter(path, engine='openpyxl') as ew:
-            df.to_excel(ew, sheet_name=sheet_name, index=False)
-            _apply_excel_sheet_styles(ew, sheet_name, df)
-        return path
-    except Exception as e:
-        is_perm = isinstance(e, PermissionError) or getattr(e, 'errno', None) == 13
-        if not is_perm:
-            raise
-
-        # If running interactively, ask user to close the file and retry.
-        # If non-interactive (CI, background), automatically write a timestamped fallback.
-        def _write_alt():
-            ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-            alt = path.with_name(f"{path.stem}_{ts}{path.suffix}")
-            with pd.ExcelWriter(alt, engine='openpyxl') as ew:
-                df.to_excel(ew, sheet_name=sheet_name, index=False)
-                _apply_excel_sheet_styles(ew, sheet_name, df)
-            print(f'Primary Excel {path} locked; wrote fallback Excel: {alt}')
-            return alt
-
-        if sys.stdin is None or not sys.stdin.isatty() or os.getenv('DBSCRIPT_NONINTERACTIVE') == '1':
-            # non-interactive: fall back immediately
-            try:
-                return _write_alt()
-            except Exception:
-                raise
+    if EXPORT_FORMAT:
+        return [] if EXPORT_FORMAT in ('none', *exclude) else [EXPORT_FORMAT]
+    formats = [name for name in available_formats() if name not in exclude]
+    default = [DEFAULT_EXPORT_FORMAT] if DEFAULT_EXPORT_FORMAT in formats else []
+    if is_noninteractive() or not formats:
+        return default
+    labels = [f"[{i}] {name}{' (default)' if name == DEFAULT_EXPORT_FORMAT else ''}" for i, name in enumerate(formats, 1)]
+    labels.append(f"[{len(formats) + 1}] none{'' if default else ' (default)'}")
+    choice = input(f"Export format? {', '.join(labels)} (comma-separated for several, e.g. 1,2): ").strip()
+    if not choice:
+        return default
+    chosen = []
+    for part in choice.split(','):
+        part = part.strip()
+        if part == str(len(formats) + 1) or part == 'none':
+            return []
+        if part.isdigit() and 1 <= int(part) <= len(formats):
+            name = formats[int(part) - 1]
+        elif part in formats:
+            name = part
+        else:
+            continue
+        if name not in chosen:
+            chosen.append(name)
+    return chosen or default
 
-        # interactive prompt: let the user attempt to close and retry up to 3 times
-        attempts = 0
-        while attempts < 3:
-            ans = input(f"File {path} appears locked. Close it and press Enter to retry, or type 's' to skip and write a timestamped fallback: ").strip().lower()
-            if ans == 's':
-                try:
-                    return _write_alt()
-                except Exception:
-                    raise
-            # otherwise, try to write again
-            attempts += 1
-            try:
-                with pd.ExcelWriter(path, engine='openpyxl') as ew:
-                    df.to_excel(ew, sheet_name=sheet_name, index=False)
-                    _apply_excel_sheet_styles(ew, sheet_name, df)
-                return path
-            except Exception as inner_e:
-                is_perm2 = isinstance(inner_e, PermissionError) or getattr(inner_e, 'errno', None) == 13
-                if not is_perm2:
-                    raise
-                print(f"Still locked (attempt {attempts}).")
 
-        # if we reach here, attempts exhausted — write fallback
-        return _write_alt()
+def _export_in_background(label: str, fn, on_done=None):
+    """Queue an export on the background ExportWorker; the scan continues immediately."""
+    export_worker().submit(label, fn, on_done=on_done)
+    print(f"[export] in wachtrij: {label}")
 
 
-def _export_df_prompt(df: pd.DataFrame, export_path: Path | str):
-    """Prompt to export `df` as XLSX, JSON, both, or none; optionally open after creation.
+def _finalize_partitions(parts: PartitionedExport | None):
+    """Write the workbook of an interrupted scan right away from the partitions written so far."""
+    if parts is None or not parts.parts:
+        return
+    try:
+        written = parts.finalize()
+        print(f"Gedeeltelijke resultaten ({len(parts.parts)} database(s)) geschreven: {written}")
+    except Exception as e:
+        print(f"Gedeeltelijke resultaten niet samengevoegd ({e}); partities staan in {parts.parts_dir}")
 
-    `export_path` is treated as a prefix; files are written into the prepared directory.
-    Returns dict of written file paths.
-    """
-    parent, prefix = _prepare_output(export_path)
-    choice = input("Export format? [1] xlsx (default), [2] json, [3] both, [4] none: ").strip()
-    if choice == '2':
-        fmt = 'json'
-    elif choice == '3':
-        fmt = 'both'
-    elif choice == '4':
-        fmt = 'none'
-    else:
-        fmt = 'xlsx'
 
-    written = {}
-    if fmt in ('xlsx', 'both'):
-        xlsxp = Path(parent) / f"{prefix}.xlsx"
+def _open_file(p: Path):
+    try:
+        os.startfile(str(p))
+    except Exception:
         try:
-            written_path = _write_xlsx_with_fallback(xlsxp, df, sheet_name='Logs')
-            written['xlsx'] = written_path
-            print(f'Wrote Excel workbook: {written_path}')
-        except Exception as e:
-            print(f'Failed to write Excel workbook {xlsxp}: {e}')
+            os.startfile(str(p.parent))
+        except Exception:
+            pass
 
-    if fmt in ('json', 'both'):
-        jsonp = Path(parent) / f"{prefix}.json"
-        try:
-            df.to_json(jsonp, orient='records', indent=2, force_ascii=False)
-            written['json'] = jsonp
-            print(f'Wrote JSON file: {jsonp}')
-        except PermissionError:
-            ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-            alt = jsonp.with_name(f"{jsonp.stem}_{ts}{jsonp.suffix}")
-            try:
-                df.to_json(alt, orient='records', indent=2, force_ascii=False)
-                written['json'] = alt
-                print(f'Primary JSON {jsonp} locked; wrote fallback JSON: {alt}')
-            except Exception as e:
-                print(f'Failed to write JSON {jsonp}: {e}')
-        except Exception as e:
-            print(f'Failed to write JSON {jsonp}: {e}')
 
-    if written:
-        open_after = input('Open exported file(s) now? [y/N]: ').strip().lower() == 'y'
-        if open_after:
-            for p in written.values():
-                try:
-                    os.startfile(str(p))
-                except Exception:
-                    try:
-                        os.startfile(str(p.parent))
-                    except Exception:
-                        pass
-    else:
-        print('No files written.')
-    return written
+def _export_df_prompt(df: pd.DataFrame, export_path: Path | str, exclude=()):
+    """Prompt for one or more export formats (xlsx, json, parquet, ndjson, csv.gz, ...) and queue `df` for writing.
+
+    `export_path` is treated as a prefix; files are written into the prepared
+    directory by the background export worker, and optionally opened once written.
+    Formats in `exclude` (e.g. an xlsx the caller writes itself) are not offered.
+    Returns dict of format -> target path (a locked target gets a timestamped name).
+    """
+    parent, prefix = _prepare_output(export_path)
+    formats = _choose_export_formats(exclude)
+    if not formats:
+        print('No other files written.' if exclude else 'No files written.')
+        return {}
+    # ask now: the files are written in the background after the scan returns
+    open_after = not is_noninteractive() and input('Open exported file(s) when written? [y/N]: ').strip().lower() == 'y'
+    queued = {}
+    for fmt in formats:
+        target = Path(parent) / f"{prefix}{EXPORT_BACKENDS[fmt][0]}"
+        _export_in_background(
+            str(target),
+            lambda fmt=fmt: export_df(df, parent, prefix, fmt, sheet_name='Logs'),
+            on_done=_open_file if open_after else None,
+        )
+        queued[fmt] = target
+    return queued
 
 load_dotenv()
 
@@ -303,6 +243,79 @@ def create_connection(database: str | None = None):
     return None
 
 
+def _list_databases(include_system: bool = False):
+    """Return sorted schema names on the first reachable host (system schemas skipped), or None."""
+    conn = create_connection(None)
+    if not conn:
+        print('Unable to connect to any host to list databases')
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute('SHOW DATABASES')
+        dbs = [r[0] for r in cur.fetchall()]
+    except Exception as e:
+        print(f'Failed to list databases: {e}')
+        return None
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+    skip = {'mysql', 'information_schema', 'performance_schema', 'sys'}
+    return [db for db in sorted(dbs) if include_system or db not in skip]
+
+
+# Columns of the per-schema `inbridge` snapshot shared by the health, poll-fail and open/recent analyses
+INBRIDGE_SNAPSHOT_COLUMNS = ['inbridgeid', 'hostname', 'polling', 'pollfailure', 'bridgestate', 'changetimestamp', 'comment']
+
+
+def _read_inbridge(conn, columns=INBRIDGE_SNAPSHOT_COLUMNS):
+    """Read `inbridge` once into a DataFrame; None when the schema has no (readable) inbridge table."""
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT {', '.join(columns)} FROM inbridge")
+        return pd.DataFrame(cur.fetchall(), columns=columns)
+    except mysql.connector.Error:
+        return None
+    finally:
+        if cur is not None:
+            try:
+                cur.close()
+            except Exception:
+                pass
+
+
+def _read_inbridge_all(include_system: bool = False, columns=INBRIDGE_SNAPSHOT_COLUMNS):
+    """Read `inbridge` of every schema on the first reachable host via chunked UNION ALL queries.
+
+    Returns mapping database -> DataFrame (schemas without inbridge are absent), or None.
+    """
+    conn = create_connection(None)
+    if not conn:
+        print('Unable to connect to any host to list databases')
+        return None
+    try:
+        schemas = inbridge_schemas(conn, include_system)
+        snapshot = read_inbridge_union(conn, schemas, columns)
+    except Exception as e:
+        print(f'Failed to read inbridge snapshot: {e}')
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    print(f"Read inbridge of {len(schemas)} databases ({len(snapshot)} bridges)")
+    grouped = {db: df.drop(columns='database').reset_index(drop=True) for db, df in snapshot.groupby('database', sort=False)}
+    # keep schemas with an empty inbridge so callers see every database
+    return {db: grouped.get(db, pd.DataFrame(columns=list(columns))) for db in schemas}
+
+
 def list_bridges_for_db(database: str):
     conn = create_connection(database)
     if not conn:
@@ -383,14 +396,19 @@ def list_bridges_for_db(database: str):
         conn.close()
 
 
-def analyze_all_bridges(database: str, gap_minutes: int = 15, restart_threshold: int = 3, limit: int = 100000, min_restart_days: int = 2, window_days: int = 4, restart_window_threshold: int = 20):
+def analyze_all_bridges(database: str, gap_minutes: int = 15, restart_threshold: int = 3, limit: int = 100000, min_restart_days: int = 2, window_days: int = 4, restart_window_threshold: int = 20, conn=None, inbridge_df: pd.DataFrame | None = None):
     """Analyze `communicationlog` for all bridges in `database`.
 
     Flags bridges with either more than `restart_window_threshold` restarts within
     the last `window_days` days, or with gaps longer than `gap_minutes` minutes.
     Returns a DataFrame of flagged bridges (may be empty).
+
+    `conn` and `inbridge_df` let a caller (the fleet sweep) reuse its connection
+    and `inbridge` snapshot; otherwise both are opened/read here.
     """
-    conn = create_connection(database)
+    own_conn = conn is None
+    if own_conn:
+        conn = create_connection(database)
     if not conn:
         print(f"Unable to connect to database {database}")
         return pd.DataFrame()
@@ -426,19 +444,13 @@ def analyze_all_bridges(database: str, gap_minutes: int = 15, restart_threshold:
                 return 'ab'
             return 'normal'
 
-        # Fetch bridge metadata (hostname/comment) to enrich output
-        try:
-            cur2 = conn.cursor(dictionary=True)
-            cur2.execute('SELECT inbridgeid, hostname, comment FROM inbridge')
-            meta_rows = cur2.fetchall()
-            meta = {r['inbridgeid']: r for r in meta_rows}
-        except Exception:
+        # Bridge metadata (hostname/comment) and poll counters, read once
+        if inbridge_df is None:
+            inbridge_df = _read_inbridge(conn, INBRIDGE_SNAPSHOT_COLUMNS)
+        if inbridge_df is not None and not inbridge_df.empty:
+            meta = inbridge_df.set_index('inbridgeid', drop=False).to_dict('index')
+        else:
             meta = {}
-        finally:
-            try:
-                cur2.close()
-            except Exception:
-                pass
 
         results = []
         cutoff = datetime.now() - timedelta(days=int(window_days))
@@ -531,31 +543,14 @@ def analyze_all_bridges(database: str, gap_minutes: int = 15, restart_threshold:
 
         disp_cols = ['inbridgeid', 'host', 'total', 'restart', 'restarts_in_window', 'max_restarts_in_day', 'date_max_restarts', 'ab', 'gaps_over_threshold', 'max_gap_min']
         # Poll fails percentage (if possible)
-        try:
-            cur2 = conn.cursor(dictionary=True)
-            cur2.execute('SELECT inbridgeid, polling, pollfailure FROM inbridge')
-            poll_rows = cur2.fetchall()
-            poll_map = {r['inbridgeid']: r for r in poll_rows}
-        except Exception:
-            poll_map = {}
-        finally:
-            try:
-                cur2.close()
-            except Exception:
-                pass
-        poll_fail_perc = []
-        for ix, row in flagged_df.iterrows():
-            bid = row['inbridgeid']
-            poll = poll_map.get(bid, {}).get('polling', 0)
-            pollfail = poll_map.get(bid, {}).get('pollfailure', 0)
-            try:
-                poll = int(poll)
-                pollfail = int(pollfail)
-                perc = 100.0 * pollfail / poll if poll else 0.0
-            except Exception:
-                perc = 0.0
-            poll_fail_perc.append(round(perc, 1))
-        flagged_df['pollfail_percent'] = poll_fail_perc
+        if inbridge_df is not None and not inbridge_df.empty:
+            poll_df = inbridge_df.set_index('inbridgeid')
+        else:
+            poll_df = pd.DataFrame(columns=['polling', 'pollfailure'])
+        flagged_df['pollfail_percent'] = pollfail_percent(
+            flagged_df['inbridgeid'].map(poll_df['polling']),
+            flagged_df['inbridgeid'].map(poll_df['pollfailure']),
+        )
         disp_cols.append('pollfail_percent')
         # Filter for pollfail > 15% if any
         pollfail_flagged = flagged_df[flagged_df['pollfail_percent'] > 15.0]
@@ -577,10 +572,11 @@ def analyze_all_bridges(database: str, gap_minutes: int = 15, restart_threshold:
             cur.close()
         except Exception:
             pass
-        try:
-            conn.close()
-        except Exception:
-            pass
+        if own_conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
 
 
 def analyze_all_databases(gap_minutes: int = 15, restart_threshold: int = 3, limit: int = 100000, include_system: bool = False, export_path: str | None = None, min_restart_days: int = 2, window_days: int = 4, restart_window_threshold: int = 20):
@@ -589,186 +585,196 @@ def analyze_all_databases(gap_minutes: int = 15, restart_threshold: int = 3, lim
 
     Skips system schemas by default. Connects using the same `create_connection` helper
     (no default database) so `.env` hosts and credentials are used.
-    """
-    conn = create_connection(None)
-    if not conn:
-        print('Unable to connect to any host to list databases')
-        return
-    try:
-        cur = conn.cursor()
-        cur.execute('SHOW DATABASES')
-        dbs = [r[0] for r in cur.fetchall()]
-    except Exception as e:
-        print(f'Failed to list databases: {e}')
-        return
-    finally:
-        try:
-            cur.close()
-        except Exception:
-            pass
-        try:
-            conn.close()
-        except Exception:
-            pass
 
-    skip = {'mysql', 'information_schema', 'performance_schema', 'sys'}
+    Returns {database: number of flagged bridges}. With `export_path` the flagged
+    frames only live in the partitions, which become the exported workbook.
+    """
+    dbs = _list_databases(include_system)
+    if dbs is None:
+        return {}
     all_flagged = {}
-    for db in sorted(dbs):
-        if not include_system and db in skip:
-            continue
-        # Quick check whether this schema contains an inbridge table
-        try:
+    frames = {}
+    # per-schema partitions are written as each schema finishes (see PartitionedExport)
+    parts = None
+    if export_path:
+        parent, prefix = _prepare_output(export_path)
+        parts = PartitionedExport(parent, prefix, combined_sheet='FlaggedBridges')
+    try:
+        for db in dbs:
+            # One connection per schema; reading inbridge doubles as the "has inbridge" check
             c = create_connection(db)
             if not c:
                 print(f"Skipping {db}: cannot connect")
                 continue
             try:
-                cur2 = c.cursor()
-                cur2.execute("SELECT 1 FROM inbridge LIMIT 1")
-                cur2.fetchall()
-                has_inbridge = True
-            except Exception:
-                has_inbridge = False
+                inbridge_df = _read_inbridge(c)
+                if inbridge_df is None:
+                    # skip schemas without inbridge table
+                    continue
+
+                print('\n' + '=' * 60)
+                print(f"Analyzing database: {db}")
+                print('=' * 60)
+                flagged_df = analyze_all_bridges(db, gap_minutes=gap_minutes, restart_threshold=restart_threshold, limit=limit, min_restart_days=min_restart_days, window_days=window_days, restart_window_threshold=restart_window_threshold, conn=c, inbridge_df=inbridge_df)
             finally:
-                try:
-                    cur2.close()
-                except Exception:
-                    pass
                 try:
                     c.close()
                 except Exception:
                     pass
-        except Exception:
-            has_inbridge = False
-
-        if not has_inbridge:
-            # skip schemas without inbridge table
-            continue
-
-        print('\n' + '=' * 60)
-        print(f"Analyzing database: {db}")
-        print('=' * 60)
-        flagged_df = analyze_all_bridges(db, gap_minutes=gap_minutes, restart_threshold=restart_threshold, limit=limit, min_restart_days=min_restart_days, window_days=window_days, restart_window_threshold=restart_window_threshold)
-        if flagged_df is not None and not flagged_df.empty:
-            all_flagged[db] = flagged_df
-        else:
-            # no issues found — print green approval and skip exporting
-            print(f"{GREEN}OK \u2714{RESET} — {db} has no restarts (> {restart_window_threshold} in {window_days}d) or gaps (> {gap_minutes} min)")
+            if flagged_df is not None and not flagged_df.empty:
+                all_flagged[db] = len(flagged_df)
+                if parts is not None:
+                    # kept on disk only, so the scan holds one schema's result at a time
+                    parts.add(db, flagged_df)
+                else:
+                    frames[db] = flagged_df
+            else:
+                # no issues found — print green approval and skip exporting
+                print(f"{GREEN}OK \u2714{RESET} — {db} has no restarts (> {restart_window_threshold} in {window_days}d) or gaps (> {gap_minutes} min)")
+    except KeyboardInterrupt:
+        print(f"\nScan onderbroken na {len(all_flagged)} database(s) met bevindingen.")
+        _finalize_partitions(parts)
+        return all_flagged
 
     # After scanning all DBs, optionally summarize and offer export helpers
     if not all_flagged:
         print('\nNo problematic bridges found across scanned databases.')
         return all_flagged
 
+    if parts is not None:
+        # the combined table is only built by the workbook writer, from the partitions
+        print('\nFlagged bridges per database:')
+        for db, count in all_flagged.items():
+            print(f"  {db}: {count}")
+        try:
+            # combined sheet plus one sheet per database
+            _export_in_background(str(parent / f"{prefix}.xlsx"), parts.finalize)
+        except Exception as e:
+            print(f'Export failed: {e}')
+        return all_flagged
+
     # Combine for overview (one table, one sheet)
-    combined = pd.concat([df.assign(database=db) for db, df in all_flagged.items()], ignore_index=True)
+    combined = pd.concat([df.assign(database=db) for db, df in frames.items()], ignore_index=True)
     # Reorder columns
     cols = ['database'] + [c for c in combined.columns if c != 'database']
     combined = combined[cols]
     print('\nCombined flagged bridges across databases:')
     print(combined.to_string(index=False))
+    return all_flagged
 
-    # Export combined results if requested (one sheet, one table)
-    if export_path:
-        try:
-            parent, prefix = _prepare_output(export_path)
-            csvp = parent / f"{prefix}.csv"
-            # interactive export: prefer xlsx/json instead of CSV
-            try:
-                _export_df_prompt(combined, csvp)
-            except Exception as e:
-                print(f'Export failed: {e}')
-        except Exception as e:
-            print(f'Failed to prepare CSV path: {e}')
 
-        xlsxp = parent / f"{prefix}.xlsx"
-        try:
-            written_path = _write_xlsx_with_fallback(xlsxp, combined, sheet_name='FlaggedBridges')
-            print(f'Wrote Excel workbook: {written_path}')
-        except Exception as e:
-            print(f'Excel export failed (openpyxl may be missing or file locked): {e}')
+def _normalize_inbridge(df: pd.DataFrame) -> pd.DataFrame:
+    """Numeric pollfailure, datetime changetimestamp and upper-cased `bridgestate_norm` on a copy of `df`."""
+    df = df.copy()
+    # ensure numeric pollfailure
+    if 'pollfailure' in df.columns:
+        df['pollfailure'] = pd.to_numeric(df['pollfailure'], errors='coerce').fillna(0).astype(int)
+    else:
+        df['pollfailure'] = 0
 
-    return all_flagged
+    # normalize changetimestamp and bridgestate
+    if 'changetimestamp' in df.columns:
+        df['changetimestamp'] = pd.to_datetime(df['changetimestamp'], errors='coerce')
+    else:
+        df['changetimestamp'] = pd.NaT
+    if 'bridgestate' in df.columns:
+        df['bridgestate_norm'] = df['bridgestate'].astype(str).str.strip().str.upper()
+    else:
+        df['bridgestate_norm'] = ''
+    return df
+
+
+def _poll_failures_from_df(database: str, df: pd.DataFrame, threshold: int = 10, days: int = 1, snapshot: bool = False) -> pd.DataFrame:
+    """Poll-fail analysis of an `inbridge` snapshot (see analyze_poll_failures_db)."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = _normalize_inbridge(df)
 
+    cutoff = pd.Timestamp(datetime.now() - timedelta(days=int(days)))
 
-def analyze_poll_failures_db(database: str, threshold: int = 10, days: int = 1):
-    """Return DataFrame of bridges in `database` where pollfailure > threshold
-    AND where `bridgestate` is OPEN or `changetimestamp` is within `days` days.
+    # counter deltas since the previous snapshot; snapshot all bridges, not only flagged ones
+    try:
+        recent = apply_poll_snapshot(database, df[['inbridgeid', 'polling', 'pollfailure']], record=snapshot)
+        for c in ('pollfail_percent_recent', 'pollfailure_delta', 'snapshot_since'):
+            df[c] = recent[c].to_numpy()
+    except Exception as e:
+        print(f"Poll snapshot unavailable for {database}: {e}")
+        df['pollfail_percent_recent'] = float('nan')
+        df['pollfailure_delta'] = float('nan')
+
+    # base mask: failures since the previous snapshot > threshold; the lifetime
+    # counter only for bridges without a snapshot (first run, new bridge)
+    base_mask = df['pollfailure_delta'].fillna(df['pollfailure']) > int(threshold)
+    # additional recent/open mask
+    recent_open_mask = (df['bridgestate_norm'] == 'OPEN') | (df['changetimestamp'] >= cutoff)
+
+    # require both: pollfailure exceeded AND (open or recent)
+    flagged = df[base_mask & recent_open_mask].copy()
+
+    # compute percentage of poll failures and sort high->low
+    flagged['pollfail_percent'] = pollfail_percent(flagged['polling'], flagged['pollfailure'])
+
+    if not flagged.empty:
+        # most current rate first; bridges without a previous snapshot fall back to lifetime percentage
+        flagged['_sort_pct'] = flagged['pollfail_percent_recent'].fillna(flagged['pollfail_percent'])
+        flagged = flagged.sort_values('_sort_pct', ascending=False).drop(columns='_sort_pct')
+        print(f"\nPoll-fail summary (db={database}) threshold={threshold}, recent_days={days}")
+        cols = ['inbridgeid', 'hostname', 'polling', 'pollfailure', 'pollfailure_delta', 'pollfail_percent', 'pollfail_percent_recent', 'snapshot_since', 'bridgestate', 'changetimestamp']
+        available = [c for c in cols if c in flagged.columns]
+        print(flagged[available].to_string(index=False))
+    return flagged
+
+
+def _open_recent_from_df(database: str, df: pd.DataFrame, days: int = 1) -> pd.DataFrame:
+    """Bridges of an `inbridge` snapshot that are OPEN or changed within `days` days."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = _normalize_inbridge(df)
+    cutoff = datetime.now() - timedelta(days=int(days))
+    mask = (df['bridgestate_norm'] == 'OPEN') | (df['changetimestamp'] >= pd.Timestamp(cutoff))
+    flagged = df[mask].copy()
+    if not flagged.empty:
+        print(f"\nOpen/recent bridges (db={database}) — found {len(flagged)} rows")
+        print(flagged[['inbridgeid', 'hostname', 'bridgestate', 'changetimestamp']].to_string(index=False))
+    return flagged
+
+
+def analyze_poll_failures_db(database: str, threshold: int = 10, days: int = 1, snapshot: bool = False):
+    """Return DataFrame of bridges in `database` with more than `threshold` poll
+    failures AND where `bridgestate` is OPEN or `changetimestamp` is within `days` days.
+
+    Failures are counted since the previous poll counter snapshot
+    (`pollfailure_delta`, rate in `pollfail_percent_recent`); bridges without
+    a snapshot fall back to the lifetime `pollfailure` counter. With
+    `snapshot=True` the current counters are stored as the new snapshot.
     """
     conn = create_connection(database)
     if not conn:
         print(f"Unable to connect to database {database}")
         return pd.DataFrame()
     try:
-        cur = conn.cursor(dictionary=True)
-        q = (
-            "SELECT inbridgeid, hostname, polling, pollfailure, bridgestate, changetimestamp, comment "
-            "FROM inbridge"
-        )
-        cur.execute(q)
-        rows = cur.fetchall()
-        if not rows:
-            return pd.DataFrame()
-        df = pd.DataFrame(rows)
-        # ensure numeric pollfailure
-        if 'pollfailure' in df.columns:
-            df['pollfailure'] = pd.to_numeric(df['pollfailure'], errors='coerce').fillna(0).astype(int)
-        else:
-            df['pollfailure'] = 0
-
-        # normalize changetimestamp and bridgestate
-        if 'changetimestamp' in df.columns:
-            df['changetimestamp'] = pd.to_datetime(df['changetimestamp'], errors='coerce')
-        else:
-            df['changetimestamp'] = pd.NaT
-        if 'bridgestate' in df.columns:
-            df['bridgestate_norm'] = df['bridgestate'].astype(str).str.strip().str.upper()
-        else:
-            df['bridgestate_norm'] = ''
-
-        cutoff = pd.Timestamp(datetime.now() - timedelta(days=int(days)))
-
-        # base mask: pollfailure > threshold
-        base_mask = df['pollfailure'] > int(threshold)
-        # additional recent/open mask
-        recent_open_mask = (df['bridgestate_norm'] == 'OPEN') | (df['changetimestamp'] >= cutoff)
-
-        # require both: pollfailure exceeded AND (open or recent)
-        flagged = df[base_mask & recent_open_mask].copy()
-
-        # compute percentage of poll failures and sort high->low
-        try:
-            def _safe_pct_row(r):
-                try:
-                    poll = int(r.get('polling', 0) or 0)
-                    fail = int(r.get('pollfailure', 0) or 0)
-                    return round(100.0 * fail / poll, 1) if poll else 0.0
-                except Exception:
-                    return 0.0
-
-            flagged['pollfail_percent'] = flagged.apply(_safe_pct_row, axis=1)
-        except Exception:
-            flagged['pollfail_percent'] = 0.0
-
-        if not flagged.empty:
-            flagged = flagged.sort_values('pollfail_percent', ascending=False)
-            print(f"\nPoll-fail summary (db={database}) threshold={threshold}, recent_days={days}")
-            cols = ['inbridgeid', 'hostname', 'polling', 'pollfailure', 'pollfail_percent', 'bridgestate', 'changetimestamp']
-            available = [c for c in cols if c in flagged.columns]
-            print(flagged[available].to_string(index=False))
-        return flagged
-    except mysql.connector.Error as e:
-        print(f"Query error: {e}")
-        return pd.DataFrame()
+        df = _read_inbridge(conn)
     finally:
-        try:
-            cur.close()
-        except Exception:
-            pass
         try:
             conn.close()
         except Exception:
             pass
+    return _poll_failures_from_df(database, df, threshold=threshold, days=days, snapshot=snapshot)
+
+
+def _combine_poll_failures(results: dict) -> pd.DataFrame:
+    """Concatenate per-database poll-fail frames, most current failure rate first."""
+    combined = pd.concat([df.assign(database=db) for db, df in results.items()], ignore_index=True)
+    # ensure pollfail percent exists and sort by it (high->low)
+    if 'pollfail_percent' not in combined.columns:
+        combined['pollfail_percent'] = pollfail_percent(combined['polling'], combined['pollfailure'])
+
+    if 'pollfail_percent_recent' in combined.columns:
+        combined['_sort_pct'] = combined['pollfail_percent_recent'].fillna(combined['pollfail_percent'])
+        combined = combined.sort_values('_sort_pct', ascending=False).drop(columns='_sort_pct')
+    else:
+        combined = combined.sort_values('pollfail_percent', ascending=False)
+    return combined
 
 
 def analyze_poll_failures_all(threshold: int = 10, days: int = 1, include_system: bool = False, export_path: str | None = None):
@@ -776,82 +782,22 @@ def analyze_poll_failures_all(threshold: int = 10, days: int = 1, include_system
 
     Returns mapping database->DataFrame for databases with flagged rows. Optionally exports combined CSV/XLSX when export_path given.
     """
-    conn = create_connection(None)
-    if not conn:
-        print('Unable to connect to any host to list databases')
-        return {}
-    try:
-        cur = conn.cursor()
-        cur.execute('SHOW DATABASES')
-        dbs = [r[0] for r in cur.fetchall()]
-    except Exception as e:
-        print(f'Failed to list databases: {e}')
+    snapshots = _read_inbridge_all(include_system)
+    if snapshots is None:
         return {}
-    finally:
-        try:
-            cur.close()
-        except Exception:
-            pass
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-    skip = {'mysql', 'information_schema', 'performance_schema', 'sys'}
     results = {}
-    for db in sorted(dbs):
-        if not include_system and db in skip:
-            continue
-        # quick check for inbridge existence
-        try:
-            c = create_connection(db)
-            if not c:
-                continue
-            try:
-                cur2 = c.cursor()
-                cur2.execute('SELECT 1 FROM inbridge LIMIT 1')
-                has = True
-            except Exception:
-                has = False
-            finally:
-                try:
-                    cur2.close()
-                except Exception:
-                    pass
-                try:
-                    c.close()
-                except Exception:
-                    pass
-        except Exception:
-            has = False
-        if not has:
-            continue
-        flagged = analyze_poll_failures_db(db, threshold=threshold, days=days)
-        if flagged is not None and not flagged.empty:
+    for db, df in snapshots.items():
+        flagged = _poll_failures_from_df(db, df, threshold=threshold, days=days, snapshot=True)
+        if not flagged.empty:
             results[db] = flagged
 
     if not results:
         print('\nNo poll-failures above threshold found across scanned databases.')
         return results
 
-    combined = pd.concat([df.assign(database=db) for db, df in results.items()], ignore_index=True)
-    # ensure pollfail percent exists and sort by it (high->low)
-    try:
-        if 'pollfail_percent' not in combined.columns:
-            def _safe_pct_row(r):
-                try:
-                    poll = int(r.get('polling', 0) or 0)
-                    fail = int(r.get('pollfailure', 0) or 0)
-                    return round(100.0 * fail / poll, 1) if poll else 0.0
-                except Exception:
-                    return 0.0
-            combined['pollfail_percent'] = combined.apply(_safe_pct_row, axis=1)
-    except Exception:
-        combined['pollfail_percent'] = 0.0
-
-    combined = combined.sort_values('pollfail_percent', ascending=False)
+    combined = _combine_poll_failures(results)
     print('\nCombined poll-fail results:')
-    cols_print = [c for c in ['database', 'inbridgeid', 'hostname', 'polling', 'pollfailure', 'pollfail_percent'] if c in combined.columns]
+    cols_print = [c for c in ['database', 'inbridgeid', 'hostname', 'polling', 'pollfailure', 'pollfail_percent', 'pollfail_percent_recent', 'snapshot_since'] if c in combined.columns]
     print(combined[cols_print].to_string(index=False))
 
     # Always export to ICY-Logs
@@ -860,18 +806,11 @@ def analyze_poll_failures_all(threshold: int = 10, days: int = 1, include_system
     csvp = export_dir / 'pollfail_combined.csv'
     xlsxp = export_dir / 'pollfail_combined.xlsx'
     try:
-        # interactive export: prefer xlsx/json instead of CSV
-        try:
-            _export_df_prompt(combined, csvp)
-        except Exception as e:
-            print(f'Export failed: {e}')
+        _export_in_background(str(xlsxp), lambda: _write_xlsx_with_fallback(xlsxp, combined, sheet_name='PollFails'))
+        # the xlsx above is always written; offer the other formats only
+        _export_df_prompt(combined, csvp, exclude=('xlsx',))
     except Exception as e:
         print(f'Failed to prepare or export combined pollfail files: {e}')
-    try:
-        written_path = _write_xlsx_with_fallback(xlsxp, combined, sheet_name='PollFails')
-        print(f'Wrote combined pollfail workbook: {written_path}')
-    except Exception as e:
-        print(f'Excel export failed for pollfails (openpyxl may be missing or file locked): {e}')
 
     return results
 
@@ -882,80 +821,25 @@ def analyze_open_recent_all(days: int = 1, include_system: bool = False, export_
     Writes per-DB sheets into a combined XLSX when `export_path` provided.
     Returns mapping database->DataFrame for databases with flagged rows.
     """
-    conn = create_connection(None)
-    if not conn:
-        print('Unable to connect to any host to list databases')
-        return {}
-    try:
-        cur = conn.cursor()
-        cur.execute('SHOW DATABASES')
-        dbs = [r[0] for r in cur.fetchall()]
-    except Exception as e:
-        print(f'Failed to list databases: {e}')
+    snapshots = _read_inbridge_all(include_system)
+    if snapshots is None:
         return {}
-    finally:
-        try:
-            cur.close()
-        except Exception:
-            pass
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-    skip = {'mysql', 'information_schema', 'performance_schema', 'sys'}
     results = {}
-    cutoff = datetime.now() - timedelta(days=int(days))
-    for db in sorted(dbs):
-        if not include_system and db in skip:
-            continue
-        # quick check for inbridge existence
-        try:
-            c = create_connection(db)
-            if not c:
-                continue
-            try:
-                cur2 = c.cursor(dictionary=True)
-                cur2.execute('SELECT inbridgeid, hostname, bridgestate, changetimestamp, polling, pollfailure, comment FROM inbridge')
-                rows = cur2.fetchall()
-            except Exception:
-                rows = []
-            finally:
-                try:
-                    cur2.close()
-                except Exception:
-                    pass
-                try:
-                    c.close()
-                except Exception:
-                    pass
-        except Exception:
-            rows = []
-
-        if not rows:
-            continue
-        df = pd.DataFrame(rows)
-        if df.empty:
-            continue
-        # normalize changetimestamp
-        if 'changetimestamp' in df.columns:
-            df['changetimestamp'] = pd.to_datetime(df['changetimestamp'], errors='coerce')
-        else:
-            df['changetimestamp'] = pd.NaT
-        # bridgestate normalize
-        if 'bridgestate' in df.columns:
-            df['bridgestate_norm'] = df['bridgestate'].astype(str).str.strip().str.upper()
-        else:
-            df['bridgestate_norm'] = ''
-
-        mask = (df['bridgestate_norm'] == 'OPEN') | (df['changetimestamp'] >= pd.Timestamp(cutoff))
-        flagged = df[mask].copy()
-        if not flagged.empty:
-            results[db] = flagged
-            print(f"\nOpen/recent bridges (db={db}) — found {len(flagged)} rows")
-            print(flagged[['inbridgeid', 'hostname', 'bridgestate', 'changetimestamp']].to_string(index=False))
-            if export_path:
-                pass
+    parts = None
+    if export_path:
+        parent, prefix = _prepare_output(Path(export_path).with_suffix('.openrecent'))
+        parts = PartitionedExport(parent, f"{prefix}_openrecent", combined_sheet='OpenRecent')
+    try:
+        for db, df in snapshots.items():
+            flagged = _open_recent_from_df(db, df, days=days)
+            if not flagged.empty:
+                results[db] = flagged
+                if parts is not None:
+                    parts.add(db, flagged.drop(columns='bridgestate_norm', errors='ignore'))
+    except KeyboardInterrupt:
+        print(f"\nScan onderbroken na {len(results)} database(s) met bevindingen.")
+        _finalize_partitions(parts)
+        return results
 
     if not results:
         print('\nNo open or recently changed bridges found across scanned databases.')
@@ -967,18 +851,150 @@ def analyze_open_recent_all(days: int = 1, include_system: bool = False, export_
 
     if export_path:
         try:
-            csvp = Path(export_path).with_suffix('.openrecent')
-            try:
-                # interactive export prompt (xlsx/json/both)
-                _export_df_prompt(combined, csvp)
-            except Exception as e:
-                print(f'Export failed: {e}')
+            # per-DB sheets plus the combined sheet, built from the partitions
+            _export_in_background(str(parts.parent / f"{parts.prefix}.xlsx"), parts.finalize)
+            # the workbook above is the xlsx export; offer the other formats only
+            _export_df_prompt(combined, Path(export_path).with_suffix('.openrecent'), exclude=('xlsx',))
         except Exception as e:
-            print(f'Failed to prepare openrecent export path: {e}')
+            print(f'Export failed: {e}')
 
     return results
 
 
+def sweep_all_databases(gap_minutes: int = 15, restart_threshold: int = 3, limit: int = 100000, poll_threshold: int = 10, recent_days: int = 1, include_system: bool = False, export_path: str | None = None, min_restart_days: int = 2, window_days: int = 4, restart_window_threshold: int = 20):
+    """Fused fleet sweep: health, poll failures and open/recent bridges in one pass.
+
+    All `inbridge` tables are read up front in a few UNION ALL queries; per
+    schema one connection and one comlog pass then feed all three analyses
+    (instead of `all`, `pollall` and `openrecent` each enumerating, probing and
+    re-reading every schema). Writes a single workbook with one sheet per
+    analysis when `export_path` is given.
+    Returns mapping analysis name -> combined DataFrame.
+    """
+    snapshots = _read_inbridge_all(include_system)
+    if snapshots is None:
+        return {}
+    health, pollfails, openrecent = {}, {}, {}
+    for db, inbridge_df in snapshots.items():
+        c = create_connection(db)
+        if not c:
+            print(f"Skipping {db}: cannot connect")
+            continue
+        try:
+            print('\n' + '=' * 60)
+            print(f"Sweeping database: {db}")
+            print('=' * 60)
+            flagged_df = analyze_all_bridges(db, gap_minutes=gap_minutes, restart_threshold=restart_threshold, limit=limit, min_restart_days=min_restart_days, window_days=window_days, restart_window_threshold=restart_window_threshold, conn=c, inbridge_df=inbridge_df)
+        finally:
+            try:
+                c.close()
+            except Exception:
+                pass
+        if flagged_df is not None and not flagged_df.empty:
+            health[db] = flagged_df
+        pf = _poll_failures_from_df(db, inbridge_df, threshold=poll_threshold, days=recent_days, snapshot=True)
+        if not pf.empty:
+            pollfails[db] = pf
+        orc = _open_recent_from_df(db, inbridge_df, days=recent_days)
+        if not orc.empty:
+            openrecent[db] = orc
+
+    def _database_first(combined):
+        combined = combined.drop(columns='bridgestate_norm', errors='ignore')
+        return combined[['database'] + [c for c in combined.columns if c != 'database']]
+
+    sheets = {
+        'FlaggedBridges': _database_first(pd.concat([df.assign(database=db) for db, df in health.items()], ignore_index=True)) if health else pd.DataFrame(),
+        'PollFails': _database_first(_combine_poll_failures(pollfails)) if pollfails else pd.DataFrame(),
+        'OpenRecent': _database_first(pd.concat([df.assign(database=db) for db, df in openrecent.items()], ignore_index=True)) if openrecent else pd.DataFrame(),
+    }
+
+    print('\nSweep summary:')
+    for name, df in sheets.items():
+        print(f"  {name}: {len(df)} rows")
+
+    if export_path:
+        parent, prefix = _prepare_output(export_path)
+        xlsxp = parent / f"{prefix}.xlsx"
+        _export_in_background(str(xlsxp), lambda: _write_xlsx_sheets_with_fallback(xlsxp, sheets))
+    return sheets
+
+
+def rollup_bridges(database: str, days: int = 90, gap_minutes: int = 15, restart_threshold: int = 3, window_days: int = 4, restart_window_threshold: int = 20):
+    """Update the local comlog rollups for `database` and analyze the last `days` days from them.
+
+    Only comlog rows newer than the previous run are fetched; the analysis itself
+    reads the daily rollups, so long ranges cost no extra database scans.
+    Returns a DataFrame of flagged bridges (may be empty).
+    """
+    conn = create_connection(database)
+    if not conn:
+        print(f"Unable to connect to database {database}")
+        return pd.DataFrame()
+    try:
+        n = update_rollups(conn, database, initial_days=days)
+        print(f"Rollups bijgewerkt voor {database}: {n} nieuwe comlog rows")
+    except mysql.connector.Error as e:
+        print(f"Query error: {e}")
+        return pd.DataFrame()
+    except ValueError as e:
+        print(f"Rollups niet bijgewerkt: {e}")
+        return pd.DataFrame()
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    daily = read_rollups(database, 'daily', days)
+    summary = summarize_rollups(daily, restart_threshold=restart_threshold)
+    if summary.empty:
+        print(f"\nNo rollup data for database {database}")
+        return pd.DataFrame()
+
+    window_start = pd.Timestamp(datetime.now() - timedelta(days=int(window_days))).normalize()
+    in_window = daily[daily['bucket'] >= window_start].groupby('inbridgeid')['restart'].sum()
+    summary['restarts_in_window'] = summary['inbridgeid'].map(in_window).fillna(0).astype(int)
+
+    mask = (summary['restarts_in_window'] > int(restart_window_threshold)) | (summary['max_gap_min'] > gap_minutes)
+    flagged_df = summary[mask].copy()
+    print(f"\nLong-range bridge summary from rollups (db={database}) — {days}d, gap threshold {gap_minutes} min, window_days={window_days}, restart_window_threshold={restart_window_threshold}")
+    if flagged_df.empty:
+        return flagged_df
+    disp_cols = ['inbridgeid', 'days', 'total', 'restart', 'restarts_in_window', 'max_restarts_in_day', 'date_max_restarts', 'days_with_restarts_over_threshold', 'ab', 'max_gap_min']
+    flagged_df = flagged_df[disp_cols]
+    print(flagged_df.sort_values(['restarts_in_window', 'max_gap_min'], ascending=False).to_string(index=False))
+    return flagged_df
+
+
+def rollup_all_databases(days: int = 90, gap_minutes: int = 15, restart_threshold: int = 3, include_system: bool = False, export_path: str | None = None, window_days: int = 4, restart_window_threshold: int = 20):
+    """Run `rollup_bridges` for every schema, prune old rollups and optionally export the combined result."""
+    dbs = _list_databases(include_system)
+    if dbs is None:
+        return {}
+    all_flagged = {}
+    for db in dbs:
+        flagged_df = rollup_bridges(db, days=days, gap_minutes=gap_minutes, restart_threshold=restart_threshold, window_days=window_days, restart_window_threshold=restart_window_threshold)
+        if flagged_df is not None and not flagged_df.empty:
+            all_flagged[db] = flagged_df
+
+    deleted = prune_rollups()
+    print(f"Rollup retention: removed {deleted.get('hourly', 0)} hourly and {deleted.get('daily', 0)} daily buckets")
+
+    if not all_flagged:
+        print('\nNo problematic bridges found in rollups across scanned databases.')
+        return all_flagged
+
+    combined = pd.concat([df.assign(database=db) for db, df in all_flagged.items()], ignore_index=True)
+    combined = combined[['database'] + [c for c in combined.columns if c != 'database']]
+    print('\nCombined flagged bridges (rollups) across databases:')
+    print(combined.to_string(index=False))
+    if export_path:
+        try:
+            _export_df_prompt(combined, export_path)
+        except Exception as e:
+            print(f'Export failed: {e}')
+    return all_flagged
 
 
 def main_menu():
@@ -998,7 +1014,7 @@ def main():
     if not db:
         print("No database provided. Exiting.")
         return
-    action = input("Enter 'a' to analyze this DB, 'poll' to check poll-failures, 'all' to analyze all databases, 'pollall' to check poll-failures across all DBs, or press Enter to list bridges: ").strip().lower()
+    action = input("Enter 'a' to analyze this DB, 'poll' to check poll-failures, 'all' to analyze all databases, 'pollall' to check poll-failures across all DBs, 'rollup' for a long-range analysis from rollups, or press Enter to list bridges: ").strip().lower()
     if action == 'a' or action == 'analyze':
         try:
             gm = input("Gap threshold minutes (default 15): ").strip()
@@ -1057,6 +1073,15 @@ def main():
             th_all = 10
         exp_all = input("Export path prefix for pollfail results (optional): ").strip() or None
         analyze_poll_failures_all(threshold=th_all, include_system=False, export_path=exp_all)
+    elif action == 'rollup':
+        try:
+            rd = input("Days to analyze from rollups (default 90): ").strip()
+            rdv = int(rd) if rd else 90
+        except Exception:
+            rdv = 90
+        df = rollup_bridges(db, days=rdv)
+        if df is not None and df.empty:
+            print(f"{GREEN}GOED! \u2714{RESET} — {db} has no restarts (>20 in 4d) or gaps (> 15 min) in the last {rdv} days")
     else:
         list_bridges_for_db(db)
 
@@ -1064,7 +1089,7 @@ def main():
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Bridge health tooling: list/analyze bridges and poll-failures')
     parser.add_argument('--db', help='Database/schema name to operate on')
-    parser.add_argument('--action', choices=['list', 'analyze', 'poll', 'all', 'pollall', 'openrecent'], help="Action: list, analyze, poll, all, pollall, openrecent")
+    parser.add_argument('--action', choices=['list', 'analyze', 'poll', 'all', 'pollall', 'openrecent', 'rollup', 'sweep'], help="Action: list, analyze, poll, all, pollall, openrecent, rollup, sweep")
     parser.add_argument('--gap-minutes', type=int, default=15, help='Gap threshold in minutes (default 15)')
     parser.add_argument('--restart-threshold', type=int, default=3, help='Restart alert threshold in a single day (default 3)')
     parser.add_argument('--limit', type=int, default=100000, help='Row limit when scanning communicationlog (default 100000)')
@@ -1073,8 +1098,12 @@ if __name__ == '__main__':
     parser.add_argument('--recent-days', type=int, default=1, help='Days to treat a change as recent for poll/open filtering (default 1)')
     parser.add_argument('--window-days', type=int, default=4, help='Window in days to count restarts (default 4)')
     parser.add_argument('--restart-window-threshold', type=int, default=20, help='Restart count threshold within window-days to flag (default 20)')
+    parser.add_argument('--rollup-days', type=int, default=90, help="Days of comlog rollups to analyze for the 'rollup' action (default 90)")
     parser.add_argument('--export', help='Export path prefix for writing CSV/XLSX outputs (optional)')
+    parser.add_argument('--export-format', choices=list(EXPORT_BACKENDS) + ['none'], help='Format for the combined export instead of prompting: xlsx, json, parquet, ndjson, csv.gz, csv.zst or none')
     args = parser.parse_args()
+    if args.export_format:
+        EXPORT_FORMAT = args.export_format
 
     # If no CLI args provided, fall back to interactive
     if not any([args.db, args.action, args.export]):
@@ -1105,3 +1134,17 @@ if __name__ == '__main__':
             # days parameter implicit from min_restart_days CLI for convenience
             days = args.min_restart_days if args.min_restart_days else 1
             analyze_open_recent_all(days=days, include_system=False, export_path=args.export)
+        elif act == 'rollup':
+            if args.db:
+                df = rollup_bridges(args.db, days=args.rollup_days, gap_minutes=args.gap_minutes, restart_threshold=args.restart_threshold, window_days=args.window_days, restart_window_threshold=args.restart_window_threshold)
+                if df is not None and df.empty:
+                    print(f"{GREEN}OK! \u2714{RESET} — {args.db} has no restarts (>{args.restart_window_threshold} in {args.window_days}d) or gaps (> {args.gap_minutes} min) in the last {args.rollup_days} days")
+            else:
+                rollup_all_databases(days=args.rollup_days, gap_minutes=args.gap_minutes, restart_threshold=args.restart_threshold, include_system=False, export_path=args.export, window_days=args.window_days, restart_window_threshold=args.restart_window_threshold)
+        elif act == 'sweep':
+            sweep_all_databases(gap_minutes=args.gap_minutes, restart_threshold=args.restart_threshold, limit=args.limit, poll_threshold=args.poll_threshold, recent_days=args.recent_days, include_system=False, export_path=args.export, min_restart_days=args.min_restart_days, window_days=args.window_days, restart_window_threshold=args.restart_window_threshold)
+
+    if is_noninteractive():
+        # tells a parent (db_menu) that the analysis is done; remaining output is export status
+        print(ANALYSIS_DONE_MARKER, flush=True)
+    flush_exports()
@@ -0,0 +1,37 @@
+"""Local SQLite store for data the DB scripts keep between runs.
+
+Used for comlog rollups and similar small caches so long-range reports do not
+have to rescan the customer databases. The file lives next to the exports in
+`%USERPROFILE%\\Documents\\ICY-Logs` unless `DBSCRIPT_STORE` points elsewhere.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+from pathlib import Path
+
+
+STORE_FILE_NAME = 'dbscript_store.sqlite3'
+
+
+def store_path() -> Path:
+    """Return the path of the local store file (not created here)."""
+    env = os.getenv('DBSCRIPT_STORE')
+    if env:
+        return Path(env)
+    user_profile = os.environ.get('USERPROFILE')
+    if user_profile:
+        return Path(user_profile) / 'Documents' / 'ICY-Logs' / STORE_FILE_NAME
+    return Path(__file__).resolve().parent / STORE_FILE_NAME
+
+
+def open_store(path: str | Path | None = None) -> sqlite3.Connection:
+    """Open (and create if needed) the local store.
+
+    WAL mode lets a report read the store while another run is updating it.
+    """
+    p = Path(path) if path else store_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(p), timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
@@ -1,6 +1,4 @@
 from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.table import Table, TableStyleInfo
 from datetime import datetime
 from dotenv import load_dotenv
 import mysql.connector
@@ -9,7 +7,12 @@ import pandas as pd
 import time
 import getpass
 import re
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import argparse
+import hashlib
+import json
+import shutil
+from exporters import write_xlsx_stream, estimate_column_widths
 
 # Environment variables
 load_dotenv()
@@ -21,21 +24,31 @@ QUERY_TIMEOUT_SECONDS = 2
 EXPORT_DIRECTORY = r"Y:\Support\Proactief werken"
 MAX_COLUMN_WIDTH = 50  # Max width for Excel columns
 
+CUSTOMERS_FILE = r"Y:\Support\Proactief werken\Script\klanten.txt"
+FETCH_WORKERS = 10  # threads die queries uitvoeren (I/O-bound)
+WRITE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))  # processen die workbooks bouwen (CPU-bound)
+
 # Database credentials
 DB_HOST = os.getenv("DB_HOST")
 DB_HOST2 = os.getenv("DB_HOST2")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+
 # Fallback naar terminal input wanneer credentials niet in environment file staan.
-if not DB_USER:
-    DB_USER = input("Voer de database username in: ")
-if not DB_PASSWORD:
-    DB_PASSWORD = getpass.getpass("Voer het ICY database wachtwoord in: ")
+# Pas in main(): de workbook-processen importeren deze module opnieuw en mogen niet prompten.
+def load_credentials():
+    global DB_USER, DB_PASSWORD
+    if not DB_USER:
+        DB_USER = input("Voer de database username in: ")
+    if not DB_PASSWORD:
+        DB_PASSWORD = getpass.getpass("Voer het ICY database wachtwoord in: ")
+
 
 # Inladen source file
-with open(r"Y:\Support\Proactief werken\Script\klanten.txt") as file:
-    customers = [customer.strip() for customer in file]
+def load_customers(path=CUSTOMERS_FILE):
+    with open(path) as file:
+        return [customer.strip() for customer in file if customer.strip()]
 
 # Queries ophalen
 def get_queries(database_name):
@@ -150,6 +163,138 @@ def get_queries(database_name):
     }
     return queries
 
+# Base-table modus: elke tabel één keer ophalen (alleen de benodigde kolommen) en de vijf
+# sheets lokaal opbouwen met pandas, in plaats van vijf queries die dezelfde joins herhalen.
+CONTROLLER_TYPE_IDS = (56, 57, 59, 60)
+BRIDGE_COLUMNS = ["hostname", "bridgetype", "comment", "swversion", "bridgestate"]
+BASE_TABLE_COLUMNS = {
+    "device": ["deviceid", "devid", "address", "devicetypeid", "locationid", "inbridgeid"],
+    "slavedevice": ["deviceid", "slavedevicetypeid", "comcount", "comquality", "inbridgeid"],
+    "location": ["locationid", "locationname", "bookgroup", "branchid", "guilocationdataid"],
+    "devicetype": ["devicetypeid", "icyname"],
+    "inbridge": ["inbridgeid"] + BRIDGE_COLUMNS,
+}
+FETCH_MODES = ("base", "queries")
+
+# Change detection: per klant een fingerprint van de brontabellen in een lokaal manifest.
+# Ongewijzigde klanten krijgen een kopie van hun vorige workbook (of worden overgeslagen).
+MANIFEST_FILE_NAME = "export_manifest.json"
+UNCHANGED_ACTIONS = ("copy", "skip")
+
+
+def customer_fingerprint(connection, database_name):
+    """Return a hash of CHECKSUM TABLE, row counts and MAX(changetimestamp) of the report tables, or None."""
+    tables = list(BASE_TABLE_COLUMNS)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("CHECKSUM TABLE " + ", ".join(f"{database_name}.{t}" for t in tables))
+        checksums = sorted((str(r[0]), r[1]) for r in cursor.fetchall())
+        cursor.execute(" UNION ALL ".join(f"SELECT '{t}', COUNT(*) FROM {database_name}.{t}" for t in tables))
+        counts = sorted((r[0], int(r[1])) for r in cursor.fetchall())
+        cursor.execute(
+            "SELECT table_name FROM information_schema.columns "
+            "WHERE table_schema = %s AND column_name = 'changetimestamp' AND table_name IN (" + ", ".join(["%s"] * len(tables)) + ")",
+            [database_name] + tables,
+        )
+        ts_tables = sorted(r[0] for r in cursor.fetchall())
+        changed = []
+        if ts_tables:
+            cursor.execute(" UNION ALL ".join(f"SELECT '{t}', MAX(changetimestamp) FROM {database_name}.{t}" for t in ts_tables))
+            changed = sorted((r[0], str(r[1])) for r in cursor.fetchall())
+    except Exception as e:
+        print(f"No fingerprint for {database_name} ({e}); exporting anyway")
+        return None
+    finally:
+        cursor.close()
+    # a CHECKSUM of NULL means the table could not be checksummed; never treat that as unchanged
+    if any(c is None for _, c in checksums):
+        return None
+    payload = json.dumps({"checksum": checksums, "count": counts, "changed": changed}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    # via a temp file, so an interrupted run never leaves a half-written manifest
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def fetch_base_tables(connection, database_name):
+    tables = {}
+    for table, columns in BASE_TABLE_COLUMNS.items():
+        tables[table] = pd.read_sql(f"SELECT {', '.join(columns)} FROM {database_name}.{table}", connection)
+    return tables
+
+
+def _join(left, right, left_on, right_on, how):
+    # SQL joins never match NULL keys; pandas would match NaN with NaN
+    right = right.dropna(subset=[right_on])
+    return left.merge(right, how=how, left_on=left_on, right_on=right_on, suffixes=("", "_r"))
+
+
+def build_report_sheets(tables):
+    """Build the five report sheets of get_queries from the base tables (same columns and row sets)."""
+    device, slavedevice = tables["device"], tables["slavedevice"]
+    location, devicetype = tables["location"], tables["devicetype"]
+    inbridge = tables["inbridge"]
+    bridge = inbridge[["inbridgeid"] + BRIDGE_COLUMNS]
+
+    is_controller = device["devicetypeid"].isin(CONTROLLER_TYPE_IDS)
+    controllers = device[is_controller]
+    # NOT IN (...) is not true for a NULL devicetypeid
+    others = device[~is_controller & device["devicetypeid"].notna()]
+
+    # Devices en slavedevices met comq
+    sd = _join(controllers[["deviceid", "locationid"]], slavedevice, "deviceid", "deviceid", "inner")
+    sd = _join(sd, location[["locationid", "locationname", "bookgroup"]], "locationid", "locationid", "inner")
+    sd = _join(sd, devicetype, "slavedevicetypeid", "devicetypeid", "inner")
+    sd = _join(sd, bridge, "inbridgeid", "inbridgeid", "left")
+    # CONCAT() is NULL as soon as one of its arguments is NULL
+    sd["controller_name"] = ("Controller: " + sd["bookgroup"].astype("string") + " " + sd["locationname"].astype("string")).astype(object)
+    sd = sd.rename(columns={"icyname": "slavedevice_name"})
+    devices_slaves = sd[["controller_name", "slavedevicetypeid", "slavedevice_name", "comcount", "comquality", "inbridgeid"] + BRIDGE_COLUMNS]
+
+    # Controller locaties
+    cl = _join(controllers[["locationid", "inbridgeid"]], location, "locationid", "locationid", "inner")
+    cl = _join(cl, bridge, "inbridgeid", "inbridgeid", "left")
+    controller_locations = cl[["locationname", "bookgroup", "branchid", "guilocationdataid"] + BRIDGE_COLUMNS]
+
+    # Devices per typeid en aantal
+    dt = _join(device[["deviceid", "devicetypeid", "inbridgeid"]], devicetype[["devicetypeid"]], "devicetypeid", "devicetypeid", "inner")
+    dt = _join(dt, bridge, "inbridgeid", "inbridgeid", "left")
+    per_type = (
+        dt.groupby(["devicetypeid"] + BRIDGE_COLUMNS, dropna=False)["deviceid"].count()
+        .rename("device_count").reset_index()
+    )
+    per_type = per_type[["devicetypeid", "device_count"] + BRIDGE_COLUMNS]
+
+    # Offline devices by devicetypeid (GROUP BY over every selected column == distinct rows)
+    off = _join(others[["deviceid", "devid", "address", "devicetypeid", "inbridgeid"]], devicetype[["devicetypeid"]], "devicetypeid", "devicetypeid", "inner")
+    off = _join(off, bridge, "inbridgeid", "inbridgeid", "left")
+    offline = off[["devicetypeid", "deviceid", "devid", "address"] + BRIDGE_COLUMNS].drop_duplicates(ignore_index=True)
+
+    # Inbridge data
+    inbridge_data = inbridge[BRIDGE_COLUMNS].drop_duplicates(ignore_index=True)
+
+    return {
+        "Devices en slavedevices met comq": devices_slaves.reset_index(drop=True),
+        "Controller locaties": controller_locations.reset_index(drop=True),
+        "Devices per typeid en aantal": per_type,
+        "Offline devices by devicetypeid": offline,
+        "Inbridge data": inbridge_data,
+    }
+
+
 # Maak een database verbinding met fallback naar de secondary host
 def create_connection(database_name):
     hosts = [DB_HOST, DB_HOST2]
@@ -184,12 +329,34 @@ def create_connection(database_name):
     print("Failed to connect after multiple attempts to all hosts.")
     return None
 
-# Exporteer gegevens voor een specifieke klant
-def export_for_customer(database_name):
+# Haal de query resultaten op voor een klant (I/O-bound, draait in een thread)
+def fetch_customer(database_name, mode="base", known_fingerprint=None):
+    """Return (database_name, df_dict, seconds, fingerprint); df_dict is empty when nothing could be fetched
+    and None when the fingerprint equals `known_fingerprint` (data unchanged, nothing fetched).
+
+    mode 'base' fetches the five base tables once and builds the sheets locally
+    (falls back to the report queries on failure); 'queries' runs the report queries.
+    """
+    start = time.perf_counter()
     connection = create_connection(database_name)
     if connection is None:
         print(f"Skipping customer {database_name} due to connection issues.")
-        return
+        return database_name, {}, time.perf_counter() - start, None
+
+    fingerprint = customer_fingerprint(connection, database_name)
+    if fingerprint is not None and fingerprint == known_fingerprint:
+        connection.close()
+        print(f"Unchanged since last export: {database_name}")
+        return database_name, None, time.perf_counter() - start, fingerprint
+
+    if mode == "base":
+        try:
+            df_dict = build_report_sheets(fetch_base_tables(connection, database_name))
+            print(f"Fetched base tables and built {len(df_dict)} sheets for {database_name}")
+            connection.close()
+            return database_name, df_dict, time.perf_counter() - start, fingerprint
+        except Exception as e:
+            print(f"Base-table fetch failed for {database_name} ({e}); falling back to report queries")
 
     queries = get_queries(database_name)
     df_dict = {}
@@ -204,11 +371,24 @@ def export_for_customer(database_name):
             continue
 
     connection.close()
+    return database_name, df_dict, time.perf_counter() - start, fingerprint
+
+
+# Bouw en schrijf het workbook van een klant (CPU-bound, draait in een apart proces)
+def write_customer_workbook(database_name, df_dict):
+    """Return (file path, seconds)."""
+    start = time.perf_counter()
+    today = datetime.now().strftime("%Y-%m-%d")
+    file_name = EXCEL_FILE_NAME_FORMAT.format(database_name, today)
+    path = export_to_excel(df_dict, EXPORT_DIRECTORY, file_name)
+    return path, time.perf_counter() - start
 
+
+# Exporteer gegevens voor een specifieke klant
+def export_for_customer(database_name, mode="base"):
+    _, df_dict, _, _ = fetch_customer(database_name, mode)
     if df_dict:
-        today = datetime.now().strftime("%Y-%m-%d")
-        file_name = EXCEL_FILE_NAME_FORMAT.format(database_name, today)
-        export_to_excel(df_dict, EXPORT_DIRECTORY, file_name)
+        write_customer_workbook(database_name, df_dict)
     else:
         print(f"No data retrieved for {database_name}, skipping Excel export.")
 
@@ -216,26 +396,134 @@ def export_for_customer(database_name):
 def export_to_excel(df_dict, directory_name, file_name):
     excel_file_path = os.path.join(directory_name, file_name)
 
-    with pd.ExcelWriter(excel_file_path, engine="openpyxl") as writer:
-        for sheet_name, df in df_dict.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            worksheet = writer.sheets[sheet_name]
-            for col_num, col in enumerate(df.columns, 1):
-                max_length = max(df[col].astype(str).apply(len).max(), len(col))
-                adjusted_width = min(max_length, MAX_COLUMN_WIDTH)
-                worksheet.column_dimensions[get_column_letter(col_num)].width = adjusted_width
-
-            table = Table(displayName=sheet_name, ref=worksheet.dimensions)
-            worksheet.add_table(table)
-            table_style = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False, showLastColumn=False, showRowStripes=True, showColumnStripes=True)
-            table.tableStyleInfo = table_style
+    column_widths = {sheet_name: estimate_column_widths(df, max_width=MAX_COLUMN_WIDTH) for sheet_name, df in df_dict.items()}
+    # write-only (streaming) workbook; table style and widths are set per sheet without touching each cell
+    write_xlsx_stream(excel_file_path, df_dict, column_widths=column_widths, table_style="TableStyleMedium9")
 
     print(f"Export complete: {excel_file_path}")
+    return excel_file_path
+
+
+def _stage_line(name, durations, wall):
+    if not durations:
+        return f"{name:<9} geen taken"
+    return (f"{name:<9} wall {wall:7.1f}s | som {sum(durations):7.1f}s | "
+            f"gem {sum(durations) / len(durations):5.1f}s | max {max(durations):5.1f}s | n={len(durations)}")
+
+
+# Parallelle uitvoering van klantexport: threads halen data op, processen schrijven de workbooks
+def _reuse_previous(database_name, entry, unchanged):
+    """Copy the previous workbook of an unchanged customer to today's name ('copy') or leave it ('skip').
+
+    Returns the path now holding the export, or None when the previous file is gone.
+    """
+    previous = entry.get("file")
+    if not previous or not os.path.exists(previous):
+        return None
+    today = datetime.now().strftime("%Y-%m-%d")
+    target = os.path.join(EXPORT_DIRECTORY, EXCEL_FILE_NAME_FORMAT.format(database_name, today))
+    if unchanged == "skip" or os.path.abspath(previous) == os.path.abspath(target):
+        return previous
+    shutil.copy2(previous, target)
+    print(f"Copied unchanged export forward: {target}")
+    return target
+
+
+def run_exports(customers, fetch_workers=FETCH_WORKERS, write_workers=WRITE_WORKERS, mode="base", force=False, unchanged="copy"):
+    """Two-stage pipeline; returns a dict with per-stage timings and failed customers.
+
+    Customers whose fingerprint matches the manifest are not fetched or written
+    (previous workbook copied forward or skipped); `force` exports everyone.
+    """
+    t0 = time.perf_counter()
+    fetch_times, write_times = [], []
+    fetch_end = write_end = t0
+    skipped, failed, reused = [], [], []
+    write_futures = {}
+    manifest_path = os.path.join(EXPORT_DIRECTORY, MANIFEST_FILE_NAME)
+    manifest = load_manifest(manifest_path)
+    fingerprints = {}
+
+    with ProcessPoolExecutor(max_workers=write_workers) as writers, \
+            ThreadPoolExecutor(max_workers=fetch_workers) as fetchers:
+        fetch_futures = []
+        for c in customers:
+            # an entry without its file on disk can not be reused; fetch normally then
+            entry = manifest.get(c, {})
+            known = None if force or not os.path.exists(entry.get("file") or "") else entry.get("fingerprint")
+            fetch_futures.append(fetchers.submit(fetch_customer, c, mode, known))
+        for fut in as_completed(fetch_futures):
+            try:
+                database_name, df_dict, seconds, fingerprint = fut.result()
+            except Exception as e:
+                print(f"Fetch failed: {e}")
+                continue
+            fetch_times.append(seconds)
+            fetch_end = time.perf_counter()
+            if df_dict is None:
+                try:
+                    path = _reuse_previous(database_name, manifest[database_name], unchanged)
+                except Exception as e:
+                    print(f"Could not reuse previous export for {database_name}: {e}")
+                    path = None
+                if path:
+                    manifest[database_name]["file"] = path
+                    reused.append(database_name)
+                    continue
+                # previous file vanished meanwhile: export after all
+                database_name, df_dict, seconds, fingerprint = fetch_customer(database_name, mode)
+                fetch_times.append(seconds)
+            fingerprints[database_name] = fingerprint
+            if not df_dict:
+                print(f"No data retrieved for {database_name}, skipping Excel export.")
+                skipped.append(database_name)
+                continue
+            # hand the frames to a writer process; fetching continues meanwhile
+            write_futures[writers.submit(write_customer_workbook, database_name, df_dict)] = database_name
+
+        for fut in as_completed(write_futures):
+            database_name = write_futures[fut]
+            try:
+                path, seconds = fut.result()
+                write_times.append(seconds)
+                if fingerprints.get(database_name):
+                    manifest[database_name] = {
+                        "fingerprint": fingerprints[database_name],
+                        "file": path,
+                        "exported_at": datetime.now().isoformat(timespec="seconds"),
+                    }
+            except Exception as e:
+                print(f"Excel export failed for {database_name}: {e}")
+                failed.append(database_name)
+            write_end = time.perf_counter()
+
+    try:
+        save_manifest(manifest_path, manifest)
+    except OSError as e:
+        print(f"Could not save export manifest {manifest_path}: {e}")
+
+    total = time.perf_counter() - t0
+    print("\n=== Export samenvatting ===")
+    print(f"Klanten: {len(customers)} | workbooks: {len(write_times)} | ongewijzigd: {len(reused)} | zonder data: {len(skipped)} | mislukt: {len(failed)}")
+    print(_stage_line("ophalen", fetch_times, fetch_end - t0) + f" | threads={fetch_workers}")
+    print(_stage_line("schrijven", write_times, write_end - t0) + f" | processen={write_workers}")
+    print(f"Totaal    {total:7.1f}s")
+    return {'fetch': fetch_times, 'write': write_times, 'skipped': skipped, 'failed': failed, 'unchanged': reused, 'total': total}
+
 
-# Parallelle uitvoering van klantexport
 def main():
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        executor.map(export_for_customer, customers)
+    parser = argparse.ArgumentParser(description="Exporteer per klant de device/bridge overzichten naar Excel")
+    parser.add_argument('--fetch-workers', type=int, default=FETCH_WORKERS, help=f'Threads voor het ophalen van query resultaten (default {FETCH_WORKERS})')
+    parser.add_argument('--write-workers', type=int, default=WRITE_WORKERS, help=f'Processen voor het schrijven van workbooks (default {WRITE_WORKERS})')
+    parser.add_argument('--customers-file', default=CUSTOMERS_FILE, help='Bestand met een klant-database per regel')
+    parser.add_argument('--fetch-mode', choices=FETCH_MODES, default='base', help="'base': elke tabel één keer ophalen en sheets lokaal bouwen (default); 'queries': de vijf rapport-queries op de server")
+    parser.add_argument('--force', action='store_true', help='Exporteer alle klanten, ook als hun data sinds de vorige export niet is gewijzigd')
+    parser.add_argument('--unchanged', choices=UNCHANGED_ACTIONS, default='copy', help="Ongewijzigde klanten: 'copy' kopieert het vorige workbook naar de naam van vandaag (default), 'skip' laat het staan")
+    args = parser.parse_args()
+
+    load_credentials()
+    customers = load_customers(args.customers_file)
+    run_exports(customers, fetch_workers=max(1, args.fetch_workers), write_workers=max(1, args.write_workers), mode=args.fetch_mode, force=args.force, unchanged=args.unchanged)
 
 if __name__ == "__main__":
     main()
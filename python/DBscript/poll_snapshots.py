@@ -0,0 +1,88 @@
+"""Poll counter snapshots per bridge, kept in the local store.
+
+`inbridge.polling` and `inbridge.pollfailure` are cumulative counters, so the
+percentage computed from them is a lifetime average. Storing the counters on
+each `pollall` run lets the next report compute the failure rate since the
+previous snapshot instead.
+"""
+from __future__ import annotations
+from datetime import datetime
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import pollfail_percent
+from local_store import open_store
+
+
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS poll_snapshot (
+    schema_name TEXT NOT NULL,
+    inbridgeid INTEGER NOT NULL,
+    polling INTEGER NOT NULL,
+    pollfailure INTEGER NOT NULL,
+    taken_at TEXT NOT NULL,
+    PRIMARY KEY (schema_name, inbridgeid)
+);
+"""
+
+
+def _counter_delta(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """current - previous; a counter that went down was reset, so everything since then is `current`."""
+    return np.where(current >= previous, current - previous, current)
+
+
+def apply_poll_snapshot(schema: str, df: pd.DataFrame, record: bool = False, store: sqlite3.Connection | None = None) -> pd.DataFrame:
+    """Add poll counter deltas since the previous snapshot of `schema` to `df`.
+
+    `df` needs inbridgeid, polling and pollfailure columns. Adds polling_delta,
+    pollfailure_delta, pollfail_percent_recent and snapshot_since (NaN/None for
+    bridges without a previous snapshot). With `record=True` the current
+    counters replace the stored snapshot.
+    """
+    own_store = store is None
+    store = store or open_store()
+    try:
+        store.executescript(_SCHEMA_SQL)
+        prev = pd.read_sql_query(
+            'SELECT inbridgeid, polling AS prev_polling, pollfailure AS prev_pollfailure, taken_at AS snapshot_since '
+            'FROM poll_snapshot WHERE schema_name = ?',
+            store, params=(schema,),
+        )
+        out = df.copy()
+        ids = pd.to_numeric(out['inbridgeid'], errors='coerce')
+        poll = pd.to_numeric(out['polling'], errors='coerce').fillna(0).astype('int64')
+        fail = pd.to_numeric(out['pollfailure'], errors='coerce').fillna(0).astype('int64')
+
+        prev = prev.set_index('inbridgeid')
+        prev_poll = ids.map(prev['prev_polling'])
+        prev_fail = ids.map(prev['prev_pollfailure'])
+        has_prev = prev_poll.notna().to_numpy()
+
+        poll_delta = _counter_delta(poll.to_numpy(), prev_poll.fillna(0).to_numpy(dtype='int64'))
+        fail_delta = _counter_delta(fail.to_numpy(), prev_fail.fillna(0).to_numpy(dtype='int64'))
+        out['polling_delta'] = np.where(has_prev, poll_delta, np.nan)
+        out['pollfailure_delta'] = np.where(has_prev, fail_delta, np.nan)
+        out['pollfail_percent_recent'] = np.where(has_prev, pollfail_percent(poll_delta, fail_delta), np.nan)
+        out['snapshot_since'] = ids.map(prev['snapshot_since']).to_numpy()
+
+        if record:
+            taken_at = datetime.now().strftime(TS_FORMAT)
+            valid = ids.notna().to_numpy()
+            with store:
+                store.executemany(
+                    'INSERT INTO poll_snapshot (schema_name, inbridgeid, polling, pollfailure, taken_at) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (schema_name, inbridgeid) DO UPDATE SET polling = excluded.polling, '
+                    'pollfailure = excluded.pollfailure, taken_at = excluded.taken_at',
+                    [
+                        (schema, int(i), int(p), int(f), taken_at)
+                        for i, p, f in zip(ids[valid], poll[valid], fail[valid])
+                    ],
+                )
+        return out
+    finally:
+        if own_store:
+            store.close()
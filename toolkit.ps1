@@ -2107,6 +2107,15 @@ function Show-BridgeComlogMenu {
     if ($sortSel -lt 0 -or $sortSel -eq ($sortOptions.Count - 1)) { return }
     if ($sortSel -eq 0) { $sortBy = "bridge_id" } else { $sortBy = $sortOptions[$sortSel] }
 
+    $modeOptions = @(
+        "Timeline (alle berichten)",
+        "Heatmap (berichten per uur, snel voor veel bridges)",
+        "Cancel"
+    )
+    $modeSel = Show-Menu -Title "Weergave" -Options $modeOptions
+    if ($modeSel -lt 0 -or $modeSel -eq ($modeOptions.Count - 1)) { return }
+    if ($modeSel -eq 1) { $mode = "heatmap" } else { $mode = "timeline" }
+
     $args = @(
         $database,
         $klantDb,
@@ -2114,13 +2123,15 @@ function Show-BridgeComlogMenu {
         $dbUser,
         $dbPassword,
         $filterInput,
-        $sortBy
+        $sortBy,
+        "--mode",
+        $mode
     )
 
     Write-Host "Starting Bridge Comlog Viewer..." -ForegroundColor Yellow
     Write-Host "Python: $py" -ForegroundColor Cyan
     Write-Host "Script: $scriptFull" -ForegroundColor Cyan
-    Write-Host ("Run: database={0}, klant={1}, minutes={2}, sort={3}" -f $database, $klantDb, $minutes, $sortBy) -ForegroundColor Cyan
+    Write-Host ("Run: database={0}, klant={1}, minutes={2}, sort={3}, mode={4}" -f $database, $klantDb, $minutes, $sortBy, $mode) -ForegroundColor Cyan
     & $py $scriptFull @args
     Pause
 }